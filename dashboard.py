@@ -1,11 +1,25 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pyodbc
+from startup import STARTUP_REPORT, ensure_worker_started, lazy_module
+
+with STARTUP_REPORT.step("import streamlit"):
+    import streamlit as st
+with STARTUP_REPORT.step("import pandas"):
+    import pandas as pd
 from datetime import datetime, timedelta
-import numpy as np
+with STARTUP_REPORT.step("import app modules"):
+    from repairs import derive_repair_status
+    from live import DEFAULT_REFRESH_SECONDS
+    from partitions import DEFAULT_USER, branches_for_user
+    from leaderboards import previous_period
+    from forecasting import LEAD_TIME_DAYS, reorder_suggestions
+    from query_cache import FilterSignature
+    from resources import (dataset_key, get_background_executor, get_branch_partitions, get_demand_forecaster,
+                           get_employee_leaderboards, get_filter_index, get_query_cache, get_repair_store,
+                           get_sales_sketches, get_status_history, load_supplier_data)
+
+# Plotting libraries load on first use by a page, not at startup
+px = lazy_module("plotly.express")
+go = lazy_module("plotly.graph_objects")
+plotly_subplots = lazy_module("plotly.subplots")
 
 # Page configuration - MUST be first Streamlit command
 st.set_page_config(
@@ -15,6 +29,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Readiness endpoint and cache prewarm - started once per process
+ensure_worker_started()
+
 # Database connection configuration
 def connect_to_sql_server():
     try:
@@ -25,6 +42,8 @@ def connect_to_sql_server():
             "UID=your_username;"
             "PWD=your_password;"
         )
+        with STARTUP_REPORT.step("import pyodbc"):
+            import pyodbc  # loaded only when a SQL Server connection is requested
         conn = pyodbc.connect(connection_string)
         return conn
     except Exception as e:
@@ -40,117 +59,9 @@ def load_data_from_sql():
         return df
     return None
 
-# Sample data creation (replace with SQL data loading)
-@st.cache_data
-def load_sample_data():
-    # Vehicle models
-    bike_models = ['Dio', 'Pulsar', 'Fz', 'Ct100', 'Platina']
-    three_wheel_models = ['Auto Rickshaw', 'Three Wheeler']
-    
-    # Sri Lankan names database
-    sri_lankan_first_names = [
-        'Kamal', 'Nimal', 'Sunil', 'Rohan', 'Ajith', 'Chaminda', 'Pradeep', 'Nuwan', 'Dinesh', 'Mahesh',
-        'Saman', 'Ruwan', 'Gayan', 'Chathura', 'Thilina', 'Kasun', 'Lahiru', 'Dilan', 'Buddhika', 'Sampath',
-        'Kumara', 'Thushara', 'Indika', 'Chandana', 'Tharaka', 'Sandun', 'Prasad', 'Udaya', 'Janaka', 'Dilshan',
-        'Sachith', 'Ranjan', 'Lakmal', 'Nalin', 'Dileepa', 'Charith', 'Ashan', 'Ranil', 'Asanka', 'Chamara',
-        'Raveena', 'Sewwandi', 'Nimali', 'Rashika', 'Sandani', 'Thanuja', 'Kavisha', 'Dilrukshi', 'Chathurika', 'Dinusha',
-        'Gayani', 'Malani', 'Anusha', 'Shamali', 'Nadeeka', 'Priyanka', 'Charuni', 'Manisha', 'Randika', 'Tharushi',
-        'Hiruni', 'Sachini', 'Buddhini', 'Nayana', 'Ishara', 'Amila', 'Suranga', 'Darshana', 'Isuru', 'Shanka'
-    ]
-    
-    sri_lankan_last_names = [
-        'Silva', 'Perera', 'Fernando', 'Jayawardena', 'Gunasekara', 'Wijesinghe', 'Rajapaksa', 'Wickramasinghe',
-        'Mendis', 'Bandara', 'Rathnayaka', 'Dissanayaka', 'Gunawardena', 'Senaratne', 'Wijerathne', 'Peiris',
-        'Kumara', 'Weerasinghe', 'Jayasuriya', 'Ranasinghe', 'Gamage', 'Amarasinghe', 'Liyanage', 'Abeywardena',
-        'Abeysinghe', 'Wickremaratne', 'Ratnayake', 'Kumarasinghe', 'Priyantha', 'Samaraweera', 'Herath', 'Karunaratne',
-        'Jayaratne', 'Weerasekara', 'Kodikara', 'Senanayake', 'Wickramage', 'Dharmasena', 'Pathirana', 'Madusanka'
-    ]
-    
-    # Sri Lankan cities and areas
-    sri_lankan_addresses = [
-        'Colombo 01', 'Colombo 02', 'Colombo 03', 'Colombo 04', 'Colombo 05', 'Colombo 06', 'Colombo 07',
-        'Dehiwala', 'Mount Lavinia', 'Moratuwa', 'Panadura', 'Kalutara', 'Beruwala', 'Bentota', 'Galle',
-        'Matara', 'Tangalle', 'Hambantota', 'Ratnapura', 'Embilipitiya', 'Balangoda', 'Kandy', 'Peradeniya',
-        'Gampola', 'Nawalapitiya', 'Hatton', 'Nuwara Eliya', 'Bandarawela', 'Badulla', 'Monaragala', 'Wellawaya',
-        'Kurunegala', 'Puttalam', 'Chilaw', 'Negombo', 'Wattala', 'Ja-Ela', 'Gampaha', 'Kadawatha', 'Ragama',
-        'Kelaniya', 'Maharagama', 'Kottawa', 'Piliyandala', 'Homagama', 'Avissawella', 'Malabe', 'Battaramulla',
-        'Anuradhapura', 'Polonnaruwa', 'Dambulla', 'Sigiriya', 'Matale', 'Akurana', 'Trincomalee', 'Batticaloa',
-        'Ampara', 'Kalmunai', 'Jaffna', 'Vavuniya', 'Mannar', 'Kilinochchi', 'Mullativu'
-    ]
-    
-    # Sri Lankan vehicle number prefixes (actual format)
-    vehicle_prefixes = ['WP', 'CP', 'SP', 'EP', 'NP', 'NC', 'UP', 'SG', 'NW']
-    
-    # Generate sample data with proper 12-month distribution
-    data = []
-    current_year = datetime.now().year
-    
-    for i in range(1, 201):  # Increased sample size for better distribution
-        vehicle_type = np.random.choice(['Bike', 'Three Wheeler'], p=[0.7, 0.3])
-        if vehicle_type == 'Bike':
-            model = np.random.choice(bike_models)
-            price_range = (400000, 600000)
-        else:
-            model = np.random.choice(three_wheel_models)
-            price_range = (800000, 1000000)
-        
-        # Generate dates across all 12 months of current year
-        random_month = np.random.randint(1, 13)
-        random_day = np.random.randint(1, 29)  # Safe day range for all months
-        purchase_date = datetime(current_year, random_month, random_day)
-        
-        # Generate Sri Lankan customer details
-        first_name = np.random.choice(sri_lankan_first_names)
-        last_name = np.random.choice(sri_lankan_last_names)
-        customer_name = f"{first_name} {last_name}"
-        
-        # Generate Sri Lankan style address
-        house_no = np.random.randint(1, 999)
-        street_names = ['Galle Road', 'Kandy Road', 'Negombo Road', 'Main Street', 'Temple Road', 
-                       'School Lane', 'Church Street', 'Station Road', 'Lake Road', 'Hill Street']
-        street = np.random.choice(street_names)
-        city = np.random.choice(sri_lankan_addresses)
-        address = f"{house_no}/{np.random.randint(1, 20)}, {street}, {city}"
-        
-        # Generate Sri Lankan NIC number (format: YYMMDDXXXV or new format)
-        birth_year = np.random.randint(70, 99)  # 1970-1999
-        if np.random.random() > 0.5:  # Old format
-            nic = f"{birth_year:02d}{np.random.randint(100, 365):03d}{np.random.randint(1000, 9999):04d}V"
-        else:  # New format
-            nic = f"{1900 + birth_year}{np.random.randint(100, 365):03d}{np.random.randint(10000, 99999):05d}"
-        
-        # Generate phone number (Sri Lankan format)
-        phone = f"0{np.random.choice([70, 71, 72, 75, 76, 77, 78])}{np.random.randint(1000000, 9999999)}"
-        
-        # Generate vehicle number (Sri Lankan format)
-        prefix = np.random.choice(vehicle_prefixes)
-        if vehicle_type == 'Bike':
-            vehicle_number = f"{prefix} {np.random.choice(['CAA', 'CAB', 'CAC', 'CAD', 'CAE'])} {np.random.randint(1000, 9999)}"
-        else:
-            vehicle_number = f"{prefix} {np.random.choice(['PA', 'PB', 'PC', 'PD', 'PE'])} {np.random.randint(1000, 9999)}"
-        
-        data.append({
-            'VehicleNumber': vehicle_number,
-            'CustomerId': i,
-            'CustomerName': customer_name,
-            'Address': address,
-            'NIC': nic,
-            'Phone': phone,
-            'VehicleType': vehicle_type,
-            'Model': model,
-            'PurchaseDate': purchase_date,
-            'Payment': np.random.randint(*price_range),
-            'PaymentMethod': np.random.choice(['Cash', 'Credit Card', 'Bank Transfer', 'Cheque']),
-            'EmployeeId': np.random.randint(1, 100),
-            'Status': np.random.choice(['Sold', 'Available', 'Under Repair']),
-            'RepairCost': np.random.randint(5000, 50000) if np.random.random() > 0.7 else 0,
-            'RepairStatus': np.random.choice(['Completed', 'In Progress', 'Pending']) if np.random.random() > 0.7 else 'None'
-        })
-    
-    return pd.DataFrame(data)
-
 # Enhanced CSS with top navigation
-st.markdown("""
+with STARTUP_REPORT.step("inject CSS"):
+    st.markdown("""
 <style>
     /* Main header styling */
     .main-header {
@@ -227,7 +138,192 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load data
-df = load_sample_data()
+partitions = get_branch_partitions()
+repair_store = get_repair_store()
+
+# Keep repair events and vehicle status in step: vehicles leaving Under Repair close their open
+# repairs, and repairs past their planned end date put the vehicle back in stock
+def sync_repairs():
+    repair_store.sync(partitions)
+    for vehicle_number, branch in repair_store.complete_due():
+        frame = partitions.frame([branch])
+        under_repair = (frame.loc[frame['VehicleNumber'] == vehicle_number, 'Status'] == 'Under Repair').any()
+        if under_repair and not repair_store.has_open_repair(vehicle_number):
+            partitions.update_vehicle(vehicle_number, [branch], Status='Available', RepairStatus='Completed')
+
+sync_repairs()
+CONSOLIDATED = "All Branches (Consolidated)"
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Sales in a date range - the exact path of the Sales Reports page, served through the query cache.
+# The cache is passed in because background jobs have no script context to look it up.
+def filter_sales(filter_index, start_date, end_date, frame_key, query_cache):
+    signature = FilterSignature(equals={'Status': 'Sold'}, date_ranges={'PurchaseDate': (start_date, end_date)})
+    return query_cache.get_or_compute(frame_key, signature, filter_index.frame,
+                                            compute=lambda frame, signature: filter_index.select(signature))
+
+def render_query_cache_stats():
+    cache_stats = get_query_cache().stats()
+    st.caption(f"Query cache: {cache_stats['hits']} hits, "
+               f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} reuse), "
+               f"{cache_stats['entries']} entries / {cache_stats['bytes']/1024/1024:.1f} MB")
+
+# Polls the background exact recomputation started by approximate mode
+def render_exact_sales(polling=False):
+    _, future = st.session_state.exact_sales_job
+    if not future.done():
+        st.info("Exact recomputation running in the background...")
+        return
+    if polling:
+        st.rerun()  # finished - one full rerun replaces the polling fragment with a static table
+    exact_sales = future.result()
+    st.caption(f"Exact results: {len(exact_sales)} sales, {exact_sales['CustomerId'].nunique()} distinct customers, "
+               f"{exact_sales['VehicleNumber'].nunique()} distinct vehicles")
+    st.dataframe(exact_sales, use_container_width=True)
+
+# Live dashboard fragments - each syncs pending feed deltas, then renders from the branch rollups
+def render_kpi_metrics(branches):
+    rollup = partitions.rollup(branches)
+    current_month_idx = datetime.now().month - 1
+    current_month_sales = int(rollup.monthly_count[current_month_idx])
+    current_month_revenue = rollup.monthly_revenue[current_month_idx]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(f"Sales - {datetime.now().strftime('%B')}", current_month_sales,
+                  delta=f"Total: {rollup.sold_count}")
+    
+    with col2:
+        st.metric(f"Revenue - {datetime.now().strftime('%B')}", f"Rs.{current_month_revenue/1000000:.1f}M", 
+                 delta=f"Total: Rs.{rollup.sold_revenue/1000000:.1f}M")
+    
+    with col3:
+        if current_month_sales > 0:
+            avg_sale = current_month_revenue / current_month_sales
+        else:
+            avg_sale = 0
+        st.metric("Avg Sale (This Month)", f"Rs.{avg_sale/1000:.0f}k", delta="+8%")
+    
+    with col4:
+        vehicles_under_repair = rollup.status_counts['Under Repair']
+        week_ago = datetime.now().date() - timedelta(days=7)
+        repair_change = repair_store.opened_since(week_ago, branches) - repair_store.completed_since(week_ago, branches)
+        st.metric("Vehicles Under Repair", vehicles_under_repair, delta=f"{repair_change:+d} this week",
+                  delta_color="inverse")
+
+def render_daily_sales_chart(branches):
+    rollup = partitions.rollup(branches)
+    current_month_num = datetime.now().month
+    days_in_month = pd.Timestamp(datetime.now().year, current_month_num, 1).days_in_month
+    complete_daily = pd.DataFrame({
+        'Day': range(1, days_in_month + 1),
+        'Sales': rollup.daily_revenue[current_month_num - 1, :days_in_month]
+    })
+    
+    fig = px.line(complete_daily, x='Day', y='Sales', 
+                 title=f"Daily Sales - {datetime.now().strftime('%B %Y')}",
+                 color_discrete_sequence=['#e74c3c'])
+    fig.update_traces(mode='lines+markers', marker=dict(size=6))
+    fig.update_layout(showlegend=False, height=400)
+    st.plotly_chart(fig, use_container_width=True)
+
+def render_monthly_revenue_chart(branches):
+    rollup = partitions.rollup(branches)
+    current_month_idx = datetime.now().month - 1
+    monthly_revenue = rollup.monthly_revenue
+    
+    # Highlight current month
+    colors = ['#3498db' if i != current_month_idx else '#e74c3c' for i in range(12)]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=MONTH_NAMES, 
+        y=monthly_revenue,
+        mode='lines+markers',
+        marker=dict(size=10, color=colors),
+        line=dict(color='#3498db', width=3),
+        name='Monthly Sales'
+    ))
+    
+    fig.add_annotation(
+        x=MONTH_NAMES[current_month_idx],
+        y=monthly_revenue[current_month_idx],
+        text=f"Current Month<br>Rs.{monthly_revenue[current_month_idx]/1000000:.1f}M",
+        showarrow=True,
+        arrowhead=2,
+        bgcolor="#e74c3c",
+        bordercolor="white",
+        font=dict(color="white")
+    )
+    
+    fig.update_layout(
+        title=f"Sales Trend - {datetime.now().strftime('%B')} Highlighted",
+        showlegend=False, 
+        height=400,
+        xaxis_title="Month",
+        yaxis_title="Sales Amount (Rs.)"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+def render_monthly_count_chart(branches):
+    rollup = partitions.rollup(branches)
+    current_month_idx = datetime.now().month - 1
+    
+    # Create bar chart with current month highlighted
+    colors = ['#f39c12' if i != current_month_idx else '#e74c3c' for i in range(12)]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=MONTH_NAMES,
+        y=rollup.monthly_count,
+        marker_color=colors,
+        text=rollup.monthly_count,
+        textposition='auto'
+    ))
+    
+    fig.update_layout(
+        title=f"Vehicle Count - {datetime.now().strftime('%B')} Active",
+        showlegend=False, 
+        height=400,
+        xaxis_title="Month",
+        yaxis_title="Number of Vehicles Sold"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+def render_inventory_pie(branches):
+    rollup = partitions.rollup(branches)
+    status_counts = sorted(rollup.status_counts.items(), key=lambda item: item[1], reverse=True)
+    
+    fig = px.pie(
+        values=[count for _, count in status_counts], 
+        names=[status for status, _ in status_counts],
+        color_discrete_sequence=['#ff9999', '#66b3ff', '#99ff99'],
+        title="Inventory Distribution"
+    )
+    
+    # Update traces to show count values instead of percentages
+    fig.update_traces(
+        textposition='inside', 
+        textinfo='value+label',
+        textfont_size=12,
+        marker=dict(line=dict(color='#FFFFFF', width=2))
+    )
+    
+    fig.update_layout(
+        height=400, 
+        showlegend=True,
+        legend=dict(
+            orientation="v",
+            yanchor="middle",
+            y=0.5,
+            xanchor="left",
+            x=1.01
+        ),
+        margin=dict(l=0, r=0, t=40, b=0)
+    )
+    st.plotly_chart(fig, use_container_width=True)
 
 # Header
 st.markdown("""
@@ -236,9 +332,32 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Signed-in identity: the auth layer's user (st.login) when there is one, else the configured VMS_USER
+def signed_in_user():
+    if st.user.get('is_logged_in'):
+        return st.user.get('email')
+    return DEFAULT_USER
+
+# Showroom scope - a session only reads the branch partitions its user may see
+scope_col1, scope_col2 = st.columns([1, 3])
+current_user = signed_in_user()
+with scope_col1:
+    st.markdown(f"**Signed in as:** {current_user or 'not signed in'}")
+allowed_branches = branches_for_user(current_user, partitions.branches)
+if not allowed_branches:
+    if current_user is None:
+        st.error("Not signed in - log in, or set VMS_USER for a local run")
+    else:
+        st.error("No showroom access configured for this user")
+    st.stop()
+with scope_col2:
+    branch_options = ([CONSOLIDATED] if len(allowed_branches) > 1 else []) + allowed_branches
+    selected_branch = st.selectbox("Showroom", branch_options, key='selected_branch')
+scope_branches = allowed_branches if selected_branch == CONSOLIDATED else [selected_branch]
+
 # Top Navigation
 st.markdown('<div class="top-nav">', unsafe_allow_html=True)
-nav_col1, nav_col2, nav_col3, nav_col4, nav_col5, nav_col6 = st.columns(6)
+nav_col1, nav_col2, nav_col3, nav_col4, nav_col5, nav_col6, nav_col7 = st.columns(7)
 
 with nav_col1:
     dashboard_btn = st.button("🏠 Dashboard", use_container_width=True)
@@ -252,6 +371,8 @@ with nav_col5:
     supplier_btn = st.button("🏪 Supplier Management", use_container_width=True)
 with nav_col6:
     reports_btn = st.button("💰 Sales Reports", use_container_width=True)
+with nav_col7:
+    employee_btn = st.button("🏆 Employee Performance", use_container_width=True)
 
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -271,6 +392,12 @@ elif supplier_btn:
     st.session_state.current_page = 'supplier_management'
 elif reports_btn:
     st.session_state.current_page = 'sales_reports'
+elif employee_btn:
+    st.session_state.current_page = 'employee_performance'
+
+# Only the row-level pages read the scoped frame; the dashboard works from the merged branch rollups
+if st.session_state.current_page not in ('dashboard', 'employee_performance'):
+    df = partitions.frame(scope_branches)
 
 # Dashboard Page
 if st.session_state.current_page == 'dashboard':
@@ -278,37 +405,18 @@ if st.session_state.current_page == 'dashboard':
     
     # Current month info
     current_month = datetime.now().strftime("%B %Y")  # e.g., "June 2025"
-    current_month_num = datetime.now().month
     
     st.markdown(f'<h2 style="text-align: center; color: #2c3e50; margin-bottom: 1rem;">📅 Current Month: {current_month}</h2>', unsafe_allow_html=True)
     
-    # Filter data for current month
-    current_month_data = df[df['PurchaseDate'].dt.month == current_month_num]
+    # Live fragments re-render on their own interval from the feed-maintained aggregates
+    if 'refresh_seconds' not in st.session_state:
+        st.session_state.refresh_seconds = DEFAULT_REFRESH_SECONDS
+    refresh_seconds = st.session_state.refresh_seconds
+    # Static charts below share one merge of the per-branch rollups
+    rollup = partitions.rollup(scope_branches)
     
     # Key Metrics Row - Current Month Focus
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        current_month_sales = len(current_month_data[current_month_data['Status'] == 'Sold'])
-        total_sales = len(df[df['Status'] == 'Sold'])
-        st.metric(f"Sales - {datetime.now().strftime('%B')}", current_month_sales, delta=f"Total: {total_sales}")
-    
-    with col2:
-        current_month_revenue = current_month_data[current_month_data['Status'] == 'Sold']['Payment'].sum()
-        total_revenue = df[df['Status'] == 'Sold']['Payment'].sum()
-        st.metric(f"Revenue - {datetime.now().strftime('%B')}", f"Rs.{current_month_revenue/1000000:.1f}M", 
-                 delta=f"Total: Rs.{total_revenue/1000000:.1f}M")
-    
-    with col3:
-        if current_month_sales > 0:
-            avg_sale = current_month_revenue / current_month_sales
-        else:
-            avg_sale = 0
-        st.metric("Avg Sale (This Month)", f"Rs.{avg_sale/1000:.0f}k", delta="+8%")
-    
-    with col4:
-        vehicles_under_repair = len(df[df['Status'] == 'Under Repair'])
-        st.metric("Vehicles Under Repair", vehicles_under_repair, delta=f"-{np.random.randint(1, 5)}")
+    st.fragment(render_kpi_metrics, run_every=refresh_seconds)(scope_branches)
     
     # Time Series Charts Row
     st.markdown('<h3 style="color: #34495e; margin: 2rem 0 1rem 0;">📈 Time Series Analysis</h3>', unsafe_allow_html=True)
@@ -318,25 +426,7 @@ if st.session_state.current_page == 'dashboard':
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.subheader("📊 Daily Sales Trend (Current Month)")
-        
-        # Daily sales for current month
-        current_month_daily = current_month_data[current_month_data['Status'] == 'Sold'].groupby(
-            current_month_data['PurchaseDate'].dt.day
-        )['Payment'].sum().reset_index()
-        current_month_daily.columns = ['Day', 'Sales']
-        
-        # Create complete day range for current month
-        days_in_month = pd.Timestamp(datetime.now().year, current_month_num, 1).days_in_month
-        all_days = pd.DataFrame({'Day': range(1, days_in_month + 1)})
-        complete_daily = all_days.merge(current_month_daily, on='Day', how='left')
-        complete_daily['Sales'] = complete_daily['Sales'].fillna(0)
-        
-        fig = px.line(complete_daily, x='Day', y='Sales', 
-                     title=f"Daily Sales - {datetime.now().strftime('%B %Y')}",
-                     color_discrete_sequence=['#e74c3c'])
-        fig.update_traces(mode='lines+markers', marker=dict(size=6))
-        fig.update_layout(showlegend=False, height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.fragment(render_daily_sales_chart, run_every=refresh_seconds)(scope_branches)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
@@ -347,16 +437,9 @@ if st.session_state.current_page == 'dashboard':
         end_date = datetime.now()
         start_date = end_date - timedelta(weeks=8)
         
-        weekly_data = df[(df['PurchaseDate'] >= start_date) & (df['Status'] == 'Sold')]
-        weekly_sales = weekly_data.groupby(
-            weekly_data['PurchaseDate'].dt.isocalendar().week
-        ).agg({
-            'Payment': 'sum',
-            'VehicleNumber': 'count'
-        }).reset_index()
-        weekly_sales.columns = ['Week', 'Revenue', 'Count']
+        weekly_sales = rollup.weekly_sales(start_date)
         
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig = plotly_subplots.make_subplots(specs=[[{"secondary_y": True}]])
         fig.add_trace(
             go.Scatter(x=weekly_sales['Week'], y=weekly_sales['Revenue'], 
                       name="Revenue", mode='lines+markers', marker_color='#3498db'),
@@ -382,91 +465,13 @@ if st.session_state.current_page == 'dashboard':
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.subheader("💰 Monthly Sales Revenue (Auto-Update)")
-        
-        # Create complete 12-month data with auto-update
-        all_months = pd.DataFrame({
-            'Month': range(1, 13),
-            'MonthName': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                         'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        })
-        
-        # Get actual sales data grouped by month
-        monthly_sales = df[df['Status'] == 'Sold'].groupby(df['PurchaseDate'].dt.month)['Payment'].sum().reset_index()
-        monthly_sales.columns = ['Month', 'Payment']
-        
-        # Merge to ensure all 12 months are represented
-        complete_monthly_sales = all_months.merge(monthly_sales, on='Month', how='left')
-        complete_monthly_sales['Payment'] = complete_monthly_sales['Payment'].fillna(0)
-        
-        # Highlight current month
-        colors = ['#3498db' if i != current_month_num-1 else '#e74c3c' for i in range(12)]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=complete_monthly_sales['MonthName'], 
-            y=complete_monthly_sales['Payment'],
-            mode='lines+markers',
-            marker=dict(size=10, color=colors),
-            line=dict(color='#3498db', width=3),
-            name='Monthly Sales'
-        ))
-        
-        # Highlight current month
-        current_month_idx = current_month_num - 1
-        if current_month_idx < len(complete_monthly_sales):
-            fig.add_annotation(
-                x=complete_monthly_sales.iloc[current_month_idx]['MonthName'],
-                y=complete_monthly_sales.iloc[current_month_idx]['Payment'],
-                text=f"Current Month<br>Rs.{complete_monthly_sales.iloc[current_month_idx]['Payment']/1000000:.1f}M",
-                showarrow=True,
-                arrowhead=2,
-                bgcolor="#e74c3c",
-                bordercolor="white",
-                font=dict(color="white")
-            )
-        
-        fig.update_layout(
-            title=f"Sales Trend - {datetime.now().strftime('%B')} Highlighted",
-            showlegend=False, 
-            height=400,
-            xaxis_title="Month",
-            yaxis_title="Sales Amount (Rs.)"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.fragment(render_monthly_revenue_chart, run_every=refresh_seconds)(scope_branches)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.subheader("🚗 Vehicle Sales Count (Live Update)")
-        
-        # Get vehicle count by month
-        monthly_count = df[df['Status'] == 'Sold'].groupby(df['PurchaseDate'].dt.month).size().reset_index()
-        monthly_count.columns = ['Month', 'Count']
-        
-        # Merge with all months
-        complete_monthly_count = all_months.merge(monthly_count, on='Month', how='left')
-        complete_monthly_count['Count'] = complete_monthly_count['Count'].fillna(0)
-        
-        # Create bar chart with current month highlighted
-        colors = ['#f39c12' if i != current_month_num-1 else '#e74c3c' for i in range(12)]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=complete_monthly_count['MonthName'],
-            y=complete_monthly_count['Count'],
-            marker_color=colors,
-            text=complete_monthly_count['Count'],
-            textposition='auto'
-        ))
-        
-        fig.update_layout(
-            title=f"Vehicle Count - {datetime.now().strftime('%B')} Active",
-            showlegend=False, 
-            height=400,
-            xaxis_title="Month",
-            yaxis_title="Number of Vehicles Sold"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.fragment(render_monthly_count_chart, run_every=refresh_seconds)(scope_branches)
         st.markdown('</div>', unsafe_allow_html=True)
     
     # Charts Row 2
@@ -475,7 +480,8 @@ if st.session_state.current_page == 'dashboard':
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.subheader("Sales Breakdown by Vehicle Type")
-        vehicle_sales = df[df['Status'] == 'Sold']['VehicleType'].value_counts()
+        vehicle_sales = pd.Series(rollup.type_counts, dtype=int).sort_values(ascending=False)
+        vehicle_sales = vehicle_sales[vehicle_sales > 0]
         
         fig = go.Figure()
         for i, (vehicle_type, count) in enumerate(vehicle_sales.items()):
@@ -500,86 +506,57 @@ if st.session_state.current_page == 'dashboard':
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.subheader("Repair Cost Analytics")
-        repair_data = df[df['RepairCost'] > 0]
-        total_repair_cost = repair_data['RepairCost'].sum()
-        avg_repair_time = "23m"  # Sample data
-        
-        st.write(f"**Total Repair Cost:** Rs.{total_repair_cost/1000:.1f}k")
-        st.write(f"**Avg. Repair Time:** {avg_repair_time}")
-        st.write(f"**Days:** 1")
-        st.write(f"**No. of Vehicles Under Repair:** {vehicles_under_repair}")
+        repair_stats = repair_store.stats_for(scope_branches)
+        
+        st.write(f"**Total Repair Cost:** Rs.{repair_stats.total_cost/1000:.1f}k")
+        st.write(f"**Avg. Repair Time:** {repair_stats.avg_repair_days:.1f} days")
+        st.write(f"**Median / P90 Repair Cost:** Rs.{repair_stats.cost_percentile(50)/1000:.1f}k / "
+                 f"Rs.{repair_stats.cost_percentile(90)/1000:.1f}k")
+        st.write(f"**Repair Backlog:** {repair_stats.backlog} "
+                 f"(oldest open {repair_stats.oldest_open_days()} days)")
+        st.write(f"**No. of Vehicles Under Repair:** {rollup.status_counts['Under Repair']}")
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col3:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
         st.subheader("Inventory Status")
-        status_counts = df['Status'].value_counts()
-        
-        # Create custom labels with count values
-        labels = []
-        values = []
-        for status, count in status_counts.items():
-            labels.append(f"{status}")
-            values.append(count)
-        
-        fig = px.pie(
-            values=values, 
-            names=labels,
-            color_discrete_sequence=['#ff9999', '#66b3ff', '#99ff99'],
-            title="Inventory Distribution"
-        )
-        
-        # Update traces to show count values instead of percentages
-        fig.update_traces(
-            textposition='inside', 
-            textinfo='value+label',
-            textfont_size=12,
-            marker=dict(line=dict(color='#FFFFFF', width=2))
-        )
-        
-        fig.update_layout(
-            height=400, 
-            showlegend=True,
-            legend=dict(
-                orientation="v",
-                yanchor="middle",
-                y=0.5,
-                xanchor="left",
-                x=1.01
-            ),
-            margin=dict(l=0, r=0, t=40, b=0)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.fragment(render_inventory_pie, run_every=refresh_seconds)(scope_branches)
         st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.select_slider("Live refresh interval (seconds)",
+                     options=sorted({5, 10, 30, 60, 300, DEFAULT_REFRESH_SECONDS}), key='refresh_seconds')
 
 # Vehicle Management Page
 elif st.session_state.current_page == 'vehicle_management':
     st.title("Vehicle Management")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["All Vehicles", "Add Vehicle", "Update Vehicle", "Vehicle Actions"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["All Vehicles", "Add Vehicle", "Update Vehicle", "Vehicle Actions",
+                                             "Status History"])
     
     with tab1:
         st.subheader("All Vehicles")
         
-        # Filters
+        # Filters - options come from the bitmap index's category dictionaries
+        vehicle_index = get_filter_index(scope_branches, df)
         col1, col2, col3 = st.columns(3)
         with col1:
-            vehicle_type_filter = st.selectbox("Filter by Type", ["All"] + list(df['VehicleType'].unique()))
+            vehicle_type_filter = st.selectbox("Filter by Type", ["All"] + vehicle_index.values('VehicleType'))
         with col2:
-            status_filter = st.selectbox("Filter by Status", ["All"] + list(df['Status'].unique()))
+            status_filter = st.selectbox("Filter by Status", ["All"] + vehicle_index.values('Status'))
         with col3:
-            model_filter = st.selectbox("Filter by Model", ["All"] + list(df['Model'].unique()))
+            model_filter = st.selectbox("Filter by Model", ["All"] + vehicle_index.values('Model'))
         
-        # Apply filters
-        filtered_df = df.copy()
-        if vehicle_type_filter != "All":
-            filtered_df = filtered_df[filtered_df['VehicleType'] == vehicle_type_filter]
-        if status_filter != "All":
-            filtered_df = filtered_df[filtered_df['Status'] == status_filter]
-        if model_filter != "All":
-            filtered_df = filtered_df[filtered_df['Model'] == model_filter]
+        # Apply filters - reused from the shared cache (or narrowed from a broader cached result) when possible
+        vehicle_filters = FilterSignature(equals={
+            'VehicleType': vehicle_type_filter,
+            'Status': status_filter,
+            'Model': model_filter
+        })
+        filtered_df = get_query_cache().get_or_compute(dataset_key(scope_branches), vehicle_filters, df,
+                                                       compute=lambda frame, signature: vehicle_index.select(signature))
         
         st.dataframe(filtered_df, use_container_width=True)
+        render_query_cache_stats()
     
     with tab2:
         st.subheader("Add New Vehicle")
@@ -597,13 +574,28 @@ elif st.session_state.current_page == 'vehicle_management':
             purchase_price = st.number_input("Purchase Price (Rs.)", min_value=0, step=1000)
         
         with col2:
-            customer_id = st.number_input("Customer ID", min_value=1, step=1)
-            employee_id = st.number_input("Employee ID", min_value=1, step=1)
+            customer_id = st.number_input("Customer ID", min_value=1, step=1, key="add_vehicle_customer")
+            employee_id = st.number_input("Employee ID", min_value=1, step=1, key="add_vehicle_employee")
             payment_method = st.selectbox("Payment Method", ['Cash', 'Credit Card', 'Bank Transfer', 'Cheque'])
-            status = st.selectbox("Status", ['Available', 'Sold', 'Under Repair'])
+            status = st.selectbox("Status", ['Available', 'Sold', 'Under Repair'], key="add_vehicle_status")
+            vehicle_branch = st.selectbox("Branch", scope_branches)
         
         if st.button("Add Vehicle", type="primary"):
             # Here you would insert into database
+            partitions.add_vehicle({
+                'Branch': vehicle_branch,
+                'VehicleNumber': vehicle_number,
+                'CustomerId': customer_id,
+                'VehicleType': vehicle_type,
+                'Model': model,
+                'PurchaseDate': pd.Timestamp(datetime.now().date()),
+                'Payment': purchase_price,
+                'PaymentMethod': payment_method,
+                'EmployeeId': employee_id,
+                'Status': status,
+                'RepairCost': 0,
+                'RepairStatus': 'None'
+            })
             st.success("Vehicle added successfully!")
     
     with tab3:
@@ -617,14 +609,19 @@ elif st.session_state.current_page == 'vehicle_management':
             col1, col2 = st.columns(2)
             with col1:
                 new_status = st.selectbox("Status", ['Available', 'Sold', 'Under Repair'], 
-                                        index=['Available', 'Sold', 'Under Repair'].index(selected_vehicle['Status']))
+                                        index=['Available', 'Sold', 'Under Repair'].index(selected_vehicle['Status']),
+                                        key=f"update_vehicle_status_{vehicle_to_update}")
                 new_price = st.number_input("Price", value=int(selected_vehicle['Payment']))
             
             with col2:
-                new_customer = st.number_input("Customer ID", value=int(selected_vehicle['CustomerId']))
-                new_employee = st.number_input("Employee ID", value=int(selected_vehicle['EmployeeId']))
+                new_customer = st.number_input("Customer ID", value=int(selected_vehicle['CustomerId']),
+                                               key=f"update_vehicle_customer_{vehicle_to_update}")
+                new_employee = st.number_input("Employee ID", value=int(selected_vehicle['EmployeeId']),
+                                               key=f"update_vehicle_employee_{vehicle_to_update}")
             
             if st.button("Update Vehicle", type="primary"):
+                partitions.update_vehicle(vehicle_to_update, scope_branches, Status=new_status, Payment=new_price,
+                                          CustomerId=new_customer, EmployeeId=new_employee)
                 st.success("Vehicle updated successfully!")
     
     with tab4:
@@ -639,6 +636,11 @@ elif st.session_state.current_page == 'vehicle_management':
             repair_cost = st.number_input("Repair Cost (Rs.)", min_value=0, step=100)
             
             if st.button("Submit for Repair"):
+                repair_branch, _ = partitions.update_vehicle(repair_vehicle, scope_branches, Status='Under Repair',
+                                                             RepairCost=repair_cost, RepairStatus='Pending')
+                repair_store.add_repair(repair_vehicle, datetime.now().date(), cost=repair_cost,
+                                        details=repair_details, status='Pending', branch=repair_branch,
+                                        model=df.loc[df['VehicleNumber'] == repair_vehicle, 'Model'].iloc[0])
                 st.success("Vehicle submitted for repair!")
         
         with col2:
@@ -647,9 +649,45 @@ elif st.session_state.current_page == 'vehicle_management':
             if available_vehicles:
                 sell_vehicle = st.selectbox("Select Vehicle to Sell", available_vehicles)
                 if st.button("Mark as Sold"):
+                    partitions.update_vehicle(sell_vehicle, scope_branches, Status='Sold',
+                                              PurchaseDate=pd.Timestamp(datetime.now().date()))
                     st.success("Vehicle marked as sold!")
             else:
                 st.info("No vehicles available for sale")
+    
+    with tab5:
+        st.subheader("Inventory Over Time")
+        
+        # Status changes from the forms above reach the audit log through the branch feeds
+        status_history = get_status_history()
+        status_history.sync(partitions)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            as_of = st.date_input("Inventory as of", value=datetime.now().date())
+        with col2:
+            history_range = st.date_input("Chart Range", value=(datetime(datetime.now().year, 1, 1).date(),
+                                                                datetime.now().date()))
+        
+        inventory = status_history.inventory_at(pd.Timestamp(as_of) + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns'),
+                                                scope_branches)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Available", inventory['Available'])
+        col2.metric("Sold", inventory['Sold'])
+        col3.metric("Under Repair", inventory['Under Repair'])
+        
+        if isinstance(history_range, tuple) and len(history_range) == 2:
+            series = status_history.inventory_series(pd.date_range(*history_range), scope_branches)
+            fig = px.line(series.melt(id_vars='Date', var_name='Status', value_name='Vehicles'),
+                          x='Date', y='Vehicles', color='Status', title="Vehicles by Status (end of day)")
+            fig.update_layout(height=400)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        st.subheader("Status Audit Log")
+        audit_vehicle = st.selectbox("Vehicle", ["All"] + df['VehicleNumber'].tolist(), key='audit_vehicle')
+        st.dataframe(status_history.audit_log(scope_branches, None if audit_vehicle == "All" else audit_vehicle),
+                     use_container_width=True)
+        st.caption(f"{status_history.event_count:,} status events, {len(status_history.snapshots)} snapshots")
 
 # Customer Management Page
 elif st.session_state.current_page == 'customer_management':
@@ -715,8 +753,10 @@ elif st.session_state.current_page == 'repair_management':
     
     with tab1:
         st.subheader("Active Repairs")
-        repair_data = df[df['Status'] == 'Under Repair']
-        st.dataframe(repair_data[['VehicleNumber', 'Model', 'RepairCost', 'RepairStatus']], use_container_width=True)
+        active_repairs = repair_store.active_repairs(scope_branches)
+        st.dataframe(active_repairs[['VehicleNumber', 'Model', 'StartDate', 'EndDate', 'Location', 'RepairCost',
+                                     'RepairStatus']],
+                     use_container_width=True)
     
     with tab2:
         st.subheader("Add New Repair")
@@ -738,46 +778,35 @@ elif st.session_state.current_page == 'repair_management':
                 st.rerun()
         with col2:
             if st.button("Save", type="primary"):
-                st.success("Repair record saved!")
+                if repair_end_date < repair_start_date:
+                    st.error("Repair end date cannot be before the start date")
+                else:
+                    selected_repair_vehicle = df[df['VehicleNumber'] == repair_vehicle].iloc[0]
+                    repair_store.add_repair(repair_vehicle, repair_start_date, repair_end_date,
+                                            cost=repair_amount, location=repair_location,
+                                            details=repair_details, model=selected_repair_vehicle['Model'],
+                                            branch=selected_repair_vehicle['Branch'])
+                    repair_status = derive_repair_status(repair_start_date, repair_end_date)
+                    if repair_status != 'Completed':
+                        partitions.update_vehicle(repair_vehicle, [selected_repair_vehicle['Branch']],
+                                                  Status='Under Repair', RepairCost=repair_amount,
+                                                  RepairStatus=repair_status)
+                    st.success("Repair record saved!")
     
     with tab3:
         st.subheader("Repair History")
-        # Sample repair history
-        repair_history = df[df['RepairCost'] > 0][['VehicleNumber', 'Model', 'RepairCost', 'RepairStatus']]
+        repair_history = repair_store.repair_history(branches=scope_branches)[['VehicleNumber', 'Model', 'StartDate', 'EndDate',
+                                                        'Location', 'RepairCost', 'RepairStatus']]
         st.dataframe(repair_history, use_container_width=True)
 
 # Supplier Management Page
 elif st.session_state.current_page == 'supplier_management':
     st.title("Supplier Management")
     
-    tab1, tab2, tab3 = st.tabs(["All Suppliers", "Add Supplier", "Update Supplier"])
+    tab1, tab2, tab3, tab4 = st.tabs(["All Suppliers", "Add Supplier", "Update Supplier", "Reorder Suggestions"])
     
     with tab1:
-        # Generate realistic Sri Lankan supplier data
-        sri_lankan_supplier_companies = [
-            'Abans PLC', 'Singer (Sri Lanka) PLC', 'Softlogic Holdings PLC', 'Hemas Holdings PLC',
-            'John Keells Holdings PLC', 'Cargills (Ceylon) PLC', 'Commercial Bank of Ceylon PLC',
-            'Dialog Axiata PLC', 'Ceylon Tobacco Company PLC', 'Lanka IOC PLC',
-            'Dimo Motors', 'United Motors Lanka (UML)', 'AMW Group', 'David Pieris Motor Company',
-            'Ideal Motors', 'Micro Cars (Pvt) Ltd', 'Stafford Motor Company', 'Prestige Automobile',
-            'Asia Motor Works', 'Central Finance Company PLC'
-        ]
-        
-        supplier_types = ['Vehicle Importer', 'Parts Supplier', 'Service Provider', 'Finance Partner', 'Insurance Provider']
-        
-        suppliers = pd.DataFrame({
-            'SupplierID': [f"SUP{str(i).zfill(3)}" for i in range(1, 21)],
-            'CompanyName': np.random.choice(sri_lankan_supplier_companies, 20, replace=False),
-            'ContactPerson': [f"{np.random.choice(['Kamal', 'Nimal', 'Sunil', 'Rohan', 'Ajith', 'Chaminda', 'Pradeep', 'Nuwan', 'Dinesh', 'Mahesh', 'Saman', 'Ruwan', 'Gayan', 'Chathura', 'Thilina'])} {np.random.choice(['Silva', 'Perera', 'Fernando', 'Jayawardena', 'Gunasekara', 'Wijesinghe', 'Rajapaksa', 'Wickramasinghe', 'Mendis', 'Bandara'])}" for _ in range(20)],
-            'SupplierType': np.random.choice(supplier_types, 20),
-            'Address': [f"{np.random.randint(100, 999)}, {np.random.choice(['Galle Road', 'Kandy Road', 'Negombo Road', 'Baseline Road', 'Duplication Road'])}, {np.random.choice(['Colombo 03', 'Colombo 04', 'Dehiwala', 'Mount Lavinia', 'Moratuwa', 'Kandy', 'Galle', 'Negombo'])}" for _ in range(20)],
-            'Phone': [f"011{np.random.randint(2000000, 2999999)}" for _ in range(20)],
-            'Email': [f"{company.lower().replace(' ', '').replace('(', '').replace(')', '').replace('pvt', '').replace('plc', '').replace('ltd', '')}@gmail.com" for company in np.random.choice(sri_lankan_supplier_companies, 20, replace=False)],
-            'Rating': np.random.choice([3.5, 4.0, 4.2, 4.5, 4.7, 4.8, 4.9, 5.0], 20),
-            'LastDelivery': pd.date_range(start='2024-01-01', end='2025-06-01', periods=20).strftime('%Y-%m-%d'),
-            'TotalOrders': np.random.randint(5, 150, 20),
-            'Status': np.random.choice(['Active', 'Pending', 'Suspended'], 20, p=[0.8, 0.15, 0.05])
-        })
+        suppliers = load_supplier_data()
         
         st.dataframe(suppliers, use_container_width=True)
     
@@ -838,33 +867,116 @@ elif st.session_state.current_page == 'supplier_management':
             with col2:
                 if st.button("Save Changes", type="primary"):
                     st.success("Supplier updated successfully!")
+    
+    with tab4:
+        st.subheader("Demand Forecast & Reorder Suggestions")
+        
+        # The model spans every branch; the full table is only assembled when a day has closed
+        forecaster = get_demand_forecaster()
+        if not forecaster.is_current(datetime.now()):
+            forecaster.advance(partitions.frame(partitions.branches), datetime.now())
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            lead_time = st.slider("Supplier Lead Time (days)", min_value=3, max_value=60, value=LEAD_TIME_DAYS)
+        with col2:
+            horizon = st.slider("Forecast Horizon (days)", min_value=7, max_value=90, value=30)
+        
+        daily_forecast = forecaster.daily_forecast(horizon, group_by=('VehicleType',), branches=scope_branches)
+        fig = px.line(daily_forecast, x='Date', y='Units', color='VehicleType',
+                      title=f"Forecast Daily Unit Sales - Next {horizon} Days ({selected_branch})")
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        suggestions = reorder_suggestions(forecaster, df, scope_branches, lead_time_days=lead_time)
+        st.metric("Models to Reorder", int((suggestions['ReorderQty'] > 0).sum()),
+                  delta=f"{int(suggestions['ReorderQty'].sum())} units")
+        st.dataframe(suggestions[['Branch', 'VehicleType', 'Model', 'Forecast', 'SafetyStock', 'OnHand', 'ReorderQty']]
+                     .round({'Forecast': 1, 'SafetyStock': 1}), use_container_width=True)
 
 # Sales Reports Page
 elif st.session_state.current_page == 'sales_reports':
     st.title("Sales Reports & Analytics")
     
     # Date range selector
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns([2, 2, 1])
     with col1:
         start_date = st.date_input("Start Date", value=datetime.now() - timedelta(days=365))
     with col2:
         end_date = st.date_input("End Date", value=datetime.now())
-    
-    # Filter data by date range
-    filtered_sales = df[(df['PurchaseDate'].dt.date >= start_date) & 
-                       (df['PurchaseDate'].dt.date <= end_date) & 
-                       (df['Status'] == 'Sold')]
+    with col3:
+        approximate_mode = st.toggle("Approximate mode",
+                                     help="Answer from mergeable per-day sketches instead of scanning every sale")
+    
+    if approximate_mode:
+        # Merge the day sketches in range; the exact scan runs in the background
+        sales_sketches = get_sales_sketches()
+        sales_sketches.sync(partitions)
+        sketch, monthly_totals = sales_sketches.query(scope_branches, start_date, end_date)
+        
+        job_key = (tuple(scope_branches), start_date, end_date, partitions.version(scope_branches))
+        previous_key, previous_job = st.session_state.get('exact_sales_job', (None, None))
+        if previous_key != job_key:
+            if previous_job is not None:
+                previous_job.cancel()  # a stale scan still queued on the shared executor never starts
+            st.session_state.exact_sales_job = (job_key, get_background_executor().submit(
+                filter_sales, get_filter_index(scope_branches, df), start_date, end_date,
+                dataset_key(scope_branches), get_query_cache()))
+        
+        total_sales = sketch.sales
+        total_revenue = sketch.revenue
+        model_top = sketch.models.top_k()
+        model_sales = pd.Series(dict(model_top), dtype=float)
+        payment_sales = pd.Series(dict(sketch.payment_methods.top_k()), dtype=float)
+        monthly_sales = pd.DataFrame([(month, revenue, count) for month, (count, revenue) in monthly_totals.items()],
+                                     columns=['Month', 'Revenue', 'Count'])
+        top_model = f"{model_top[0][0]} (≈{model_top[0][1]})" if model_top else "N/A"
+    else:
+        # Filter data by date range
+        filtered_sales = filter_sales(get_filter_index(scope_branches, df), start_date, end_date,
+                                      dataset_key(scope_branches), get_query_cache())
+        total_sales = len(filtered_sales)
+        total_revenue = filtered_sales['Payment'].sum()
+        model_sales = filtered_sales['Model'].value_counts()
+        payment_sales = filtered_sales['PaymentMethod'].value_counts()
+        monthly_sales = filtered_sales.groupby(filtered_sales['PurchaseDate'].dt.month).agg({
+            'Payment': 'sum',
+            'VehicleNumber': 'count'
+        }).reset_index()
+        monthly_sales.columns = ['Month', 'Revenue', 'Count']
+        top_model = filtered_sales['Model'].mode().iloc[0] if len(filtered_sales) > 0 else "N/A"
     
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Sales", len(filtered_sales))
+        st.metric("Total Sales", total_sales)
     with col2:
-        st.metric("Total Revenue", f"Rs.{filtered_sales['Payment'].sum()/1000000:.2f}M")
+        st.metric("Total Revenue", f"Rs.{total_revenue/1000000:.2f}M")
     with col3:
-        st.metric("Average Sale", f"Rs.{filtered_sales['Payment'].mean():.0f}")
+        st.metric("Average Sale", f"Rs.{total_revenue / total_sales:.0f}" if total_sales else "N/A")
     with col4:
-        st.metric("Top Model", filtered_sales['Model'].mode().iloc[0] if len(filtered_sales) > 0 else "N/A")
+        st.metric("Top Model", top_model)
+    
+    if approximate_mode:
+        # Sketch estimates with their error bounds
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Distinct Customers", f"≈{sketch.customers.estimate():,.0f}",
+                      delta=f"±{sketch.customers.relative_error:.1%}", delta_color="off")
+        with col2:
+            st.metric("Distinct Vehicles", f"≈{sketch.vehicles.estimate():,.0f}",
+                      delta=f"±{sketch.vehicles.relative_error:.1%}", delta_color="off")
+        with col3:
+            st.metric("Payment Median / P90",
+                      f"Rs.{sketch.payments.quantile(0.5)/1000:.0f}k / Rs.{sketch.payments.quantile(0.9)/1000:.0f}k",
+                      delta=f"±{sketch.payments.accuracy:.0%}", delta_color="off")
+        with col4:
+            st.metric("Repair Cost Median / P90",
+                      f"Rs.{sketch.repair_costs.quantile(0.5)/1000:.1f}k / Rs.{sketch.repair_costs.quantile(0.9)/1000:.1f}k",
+                      delta=f"±{sketch.repair_costs.accuracy:.0%}", delta_color="off")
+        st.caption(f"Approximate mode: sale and revenue totals are exact; model and payment-method counts "
+                   f"may overcount by up to {sketch.models.error_bound:.0f} sales (count-min, 98% confidence); "
+                   f"distinct counts are HyperLogLog estimates (one standard error shown).")
     
     # Charts
     col1, col2 = st.columns(2)
@@ -872,7 +984,6 @@ elif st.session_state.current_page == 'sales_reports':
     with col1:
         # Sales by Model
         st.subheader("Sales by Model")
-        model_sales = filtered_sales['Model'].value_counts()
         fig = px.pie(values=model_sales.values, names=model_sales.index, 
                     title="Sales Distribution by Model")
         st.plotly_chart(fig, use_container_width=True)
@@ -880,7 +991,6 @@ elif st.session_state.current_page == 'sales_reports':
     with col2:
         # Sales by Payment Method
         st.subheader("Sales by Payment Method")
-        payment_sales = filtered_sales['PaymentMethod'].value_counts()
         fig = px.bar(x=payment_sales.index, y=payment_sales.values,
                     title="Sales by Payment Method")
         st.plotly_chart(fig, use_container_width=True)
@@ -895,19 +1005,12 @@ elif st.session_state.current_page == 'sales_reports':
                      'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     })
     
-    # Get actual monthly sales data
-    monthly_sales = filtered_sales.groupby(filtered_sales['PurchaseDate'].dt.month).agg({
-        'Payment': 'sum',
-        'VehicleNumber': 'count'
-    }).reset_index()
-    monthly_sales.columns = ['Month', 'Revenue', 'Count']
-    
     # Merge with complete 12-month data
     complete_monthly_sales = all_months_df.merge(monthly_sales, on='Month', how='left')
     complete_monthly_sales['Revenue'] = complete_monthly_sales['Revenue'].fillna(0)
     complete_monthly_sales['Count'] = complete_monthly_sales['Count'].fillna(0)
     
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig = plotly_subplots.make_subplots(specs=[[{"secondary_y": True}]])
     fig.add_trace(
         go.Bar(x=complete_monthly_sales['MonthName'], y=complete_monthly_sales['Revenue'], 
                name="Revenue", marker_color='lightblue'),
@@ -926,7 +1029,85 @@ elif st.session_state.current_page == 'sales_reports':
     
     # Detailed sales table
     st.subheader("Detailed Sales Data")
-    st.dataframe(filtered_sales, use_container_width=True)
+    if approximate_mode:
+        if st.session_state.exact_sales_job[1].done():
+            render_exact_sales()
+        else:
+            st.fragment(render_exact_sales, run_every=2)(polling=True)
+    else:
+        st.dataframe(filtered_sales, use_container_width=True)
+        render_query_cache_stats()
+
+# Employee Performance Page
+elif st.session_state.current_page == 'employee_performance':
+    st.title("Employee Performance")
+    
+    leaderboards = get_employee_leaderboards()
+    leaderboards.sync(partitions)
+    periods = leaderboards.periods()
+    
+    if not periods:
+        st.info("No sales recorded yet")
+    else:
+        current_period = datetime.now().strftime('%Y-%m')
+        col1, col2 = st.columns(2)
+        with col1:
+            selected_period = st.selectbox("Month", periods,
+                                           index=periods.index(current_period) if current_period in periods else 0)
+        with col2:
+            top_n = st.slider("Show Top", min_value=3, max_value=leaderboards.k, value=10)
+        
+        board = leaderboards.board(scope_branches, selected_period, partitions.branches)
+        previous_board = leaderboards.board(scope_branches, previous_period(selected_period), partitions.branches)
+        
+        # Leaderboard with month-over-month rank movement
+        leaderboard_rows = []
+        for rank, (revenue, employee_id) in enumerate(board.top_k(top_n), start=1):
+            previous_rank = previous_board.rank(employee_id)
+            leaderboard_rows.append({
+                'Rank': rank,
+                'EmployeeId': employee_id,
+                'Revenue (Rs.)': revenue,
+                'Units Sold': board.units[employee_id],
+                'Previous Rank': previous_rank if previous_rank else f">{leaderboards.k}",
+                'Movement': f"{previous_rank - rank:+d}" if previous_rank else "New"
+            })
+        leaderboard = pd.DataFrame(leaderboard_rows)
+        
+        if leaderboard.empty:
+            st.info(f"No sales for this showroom in {selected_period}")
+        else:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Active Salespeople", len(board.units))
+            with col2:
+                st.metric("Top Performer", f"Employee {leaderboard.iloc[0]['EmployeeId']}")
+            with col3:
+                st.metric("Top Revenue", f"Rs.{leaderboard.iloc[0]['Revenue (Rs.)']/1000000:.2f}M")
+        
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                st.subheader("Revenue Leaderboard")
+                fig = px.bar(leaderboard, x='Revenue (Rs.)', y=leaderboard['EmployeeId'].astype(str),
+                             orientation='h', text='Units Sold', title=f"Top {top_n} - {selected_period}")
+                fig.update_layout(yaxis=dict(autorange="reversed", title="Employee"), height=400)
+                st.plotly_chart(fig, use_container_width=True)
+        
+            with col2:
+                st.subheader("Sales Mix")
+                mix_employee = st.selectbox("Employee", leaderboard['EmployeeId'].tolist())
+                mix = pd.DataFrame([
+                    {'VehicleType': vehicle_type, 'Model': model, 'Units': units}
+                    for (vehicle_type, model), units in board.mix[mix_employee].items()
+                ])
+                fig = px.bar(mix, x='Model', y='Units', color='VehicleType',
+                             title=f"Employee {mix_employee} - Mix by Model")
+                fig.update_layout(height=400)
+                st.plotly_chart(fig, use_container_width=True)
+        
+            st.subheader("Leaderboard")
+            st.dataframe(leaderboard, use_container_width=True)
 
 st.markdown("""
 <div style="text-align: center; color: #ecf0f1; padding: 2rem; background: linear-gradient(to bottom, #0d0f14, #000000); border-radius: 15px; margin: 2rem 0;">
@@ -0,0 +1,74 @@
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+INDEXED_COLUMNS = ['VehicleType', 'Status', 'Model']
+
+
+# Per-value bitmaps over a frame; filter combinations are a bitwise AND, then one row take
+class FilterIndex:
+    def __init__(self, frame, columns=INDEXED_COLUMNS):
+        self.frame = frame
+        self.size = len(frame)
+        self.categories = {}  # column -> distinct values in first-seen order (same as Series.unique())
+        self.positions = {}  # column -> {value: row in bitmaps}
+        self.bitmaps = {}  # column -> bool array (n_values, n_rows)
+        rows = np.arange(self.size)
+        for col in columns:
+            codes, uniques = pd.factorize(frame[col])
+            bitmaps = np.zeros((len(uniques), self.size), dtype=bool)
+            known = codes >= 0
+            bitmaps[codes[known], rows[known]] = True
+            self.categories[col] = list(uniques)
+            self.positions[col] = {value: i for i, value in enumerate(self.categories[col])}
+            self.bitmaps[col] = bitmaps
+        self.dates = {}
+
+    def values(self, col):
+        return self.categories[col]
+
+    def _date_column(self, col):
+        if col not in self.dates:
+            self.dates[col] = self.frame[col].to_numpy(dtype='datetime64[ns]')
+        return self.dates[col]
+
+    def mask(self, signature):
+        mask = np.ones(self.size, dtype=bool)
+        for col, value in signature.equals.items():
+            if col in self.bitmaps:
+                position = self.positions[col].get(value)
+                if position is None:
+                    return np.zeros(self.size, dtype=bool)
+                mask &= self.bitmaps[col][position]
+            else:
+                mask &= self.frame[col].to_numpy() == value
+        for col, (start, end) in signature.date_ranges.items():
+            dates = self._date_column(col)
+            if start is not None:
+                mask &= dates >= start.to_datetime64()
+            if end is not None:
+                mask &= dates < (end + timedelta(days=1)).to_datetime64()
+        return mask
+
+    # Only the matching rows are materialized; the source frame is never copied
+    def select(self, signature):
+        return self.frame.iloc[np.flatnonzero(self.mask(signature))]
+
+
+# Latest FilterIndex per showroom scope, rebuilt only when that scope's data version changes
+class FilterIndexCache:
+    def __init__(self):
+        self.indexes = {}  # scope -> (dataset_key, FilterIndex)
+        self.lock = threading.Lock()
+
+    def get(self, scope, dataset_key, frame):
+        with self.lock:
+            cached = self.indexes.get(scope)
+            if cached is not None and cached[0] == dataset_key:
+                return cached[1]
+        index = FilterIndex(frame)
+        with self.lock:
+            self.indexes[scope] = (dataset_key, index)
+        return index
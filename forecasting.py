@@ -0,0 +1,168 @@
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+SERIES_KEYS = ['Branch', 'VehicleType', 'Model']
+SEASON_LENGTH = 7  # weekly seasonality on daily unit sales
+ALPHA_GRID = np.linspace(0.05, 0.95, 19)
+SEASONAL_GAMMA = 0.1
+LEAD_TIME_DAYS = 14
+SERVICE_LEVEL_Z = 1.65  # ~95% cycle service level
+
+
+# Daily sold units per series as an (n_series, n_days) matrix covering [start, end]
+def daily_unit_matrix(df, start, end, keys=SERIES_KEYS, series_index=None):
+    sold = df[(df['Status'] == 'Sold') &
+              (df['PurchaseDate'] >= pd.Timestamp(start)) &
+              (df['PurchaseDate'] <= pd.Timestamp(end))]
+    if series_index is None:
+        series_index = sorted(set(map(tuple, df[keys].astype(str).drop_duplicates().to_numpy())))
+    positions = {key: i for i, key in enumerate(series_index)}
+    n_days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    units = np.zeros((len(series_index), max(n_days, 0)))
+    if len(sold) and n_days > 0:
+        rows = np.array([positions.get(key, -1) for key in map(tuple, sold[keys].astype(str).to_numpy())])
+        days = (sold['PurchaseDate'].dt.normalize() - pd.Timestamp(start)).dt.days.to_numpy()
+        known = rows >= 0
+        np.add.at(units, (rows[known], days[known]), 1)
+    return series_index, units
+
+
+# Exponential smoothing with additive weekly seasonality, fitted for every series at once
+class SeasonalSmoother:
+    def __init__(self, n_series=0):
+        self.alpha = np.full(n_series, ALPHA_GRID[len(ALPHA_GRID) // 2])
+        self.level = np.zeros(n_series)
+        self.season = np.zeros((n_series, SEASON_LENGTH))
+        self.mse = np.zeros(n_series)
+        self.day_of_week = 0  # season slot of the next observation
+
+    # Grid-search alpha for all series in one batched pass: state is (n_alphas, n_series)
+    def fit(self, units, first_day_of_week=0):
+        n_series, n_days = units.shape
+        weeks = max(n_days // SEASON_LENGTH, 1)
+        season = np.zeros((n_series, SEASON_LENGTH))
+        if n_days >= SEASON_LENGTH:
+            slots = (np.arange(weeks * SEASON_LENGTH) + first_day_of_week) % SEASON_LENGTH
+            trimmed = units[:, :weeks * SEASON_LENGTH]
+            for slot in range(SEASON_LENGTH):
+                season[:, slot] = trimmed[:, slots == slot].mean(axis=1)
+            season -= season.mean(axis=1, keepdims=True)
+
+        alphas = ALPHA_GRID[:, None]
+        initial_level = units[:, :SEASON_LENGTH].mean(axis=1) if n_days else np.zeros(n_series)
+        level = np.broadcast_to(initial_level, (len(ALPHA_GRID), n_series)).copy()
+        sse = np.zeros((len(ALPHA_GRID), n_series))
+        for t in range(n_days):
+            slot = (first_day_of_week + t) % SEASON_LENGTH
+            error = units[:, t] - (level + season[:, slot])
+            sse += error ** 2
+            level += alphas * error
+
+        best = sse.argmin(axis=0)
+        columns = np.arange(n_series)
+        self.alpha = ALPHA_GRID[best]
+        self.level = level[best, columns]
+        self.season = season
+        self.mse = sse[best, columns] / max(n_days, 1)
+        self.day_of_week = (first_day_of_week + n_days) % SEASON_LENGTH
+        return self
+
+    # Fold one more day of observations into the fitted state, O(n_series)
+    def update(self, units_today):
+        slot = self.day_of_week
+        error = units_today - (self.level + self.season[:, slot])
+        self.mse = 0.95 * self.mse + 0.05 * error ** 2
+        self.level = self.level + self.alpha * error
+        self.season[:, slot] += SEASONAL_GAMMA * (units_today - self.level - self.season[:, slot])
+        self.day_of_week = (slot + 1) % SEASON_LENGTH
+
+    def add_series(self, count):
+        self.alpha = np.concatenate([self.alpha, np.full(count, ALPHA_GRID[len(ALPHA_GRID) // 2])])
+        self.level = np.concatenate([self.level, np.zeros(count)])
+        self.season = np.vstack([self.season, np.zeros((count, SEASON_LENGTH))])
+        self.mse = np.concatenate([self.mse, np.zeros(count)])
+
+    def forecast(self, horizon):
+        slots = (self.day_of_week + np.arange(horizon)) % SEASON_LENGTH
+        return np.clip(self.level[:, None] + self.season[:, slots], 0, None)
+
+
+# Cached demand model over all branch/type/model series, advanced one closed day at a time
+class DemandForecaster:
+    def __init__(self, keys=SERIES_KEYS):
+        self.keys = keys
+        self.series_index = []
+        self.model = SeasonalSmoother()
+        self.last_day = None
+        self.lock = threading.Lock()
+
+    def fit(self, df, as_of):
+        end = pd.Timestamp(as_of).normalize() - timedelta(days=1)  # only fully closed days
+        start = min(df['PurchaseDate'].min().normalize(), end)
+        with self.lock:
+            self.series_index, units = daily_unit_matrix(df, start, end, self.keys)
+            self.model = SeasonalSmoother(len(self.series_index)).fit(units, start.dayofweek)
+            self.last_day = end
+        return self
+
+    # False once a day has closed since the last fit/advance - check before building the frame
+    def is_current(self, as_of):
+        return self.last_day is not None and pd.Timestamp(as_of).normalize() - timedelta(days=1) <= self.last_day
+
+    # Apply only the days closed since the last fit/advance
+    def advance(self, df, as_of):
+        end = pd.Timestamp(as_of).normalize() - timedelta(days=1)
+        with self.lock:
+            if self.last_day is None or end <= self.last_day:
+                return 0
+            known = set(self.series_index)
+            new_series = sorted(set(map(tuple, df[self.keys].astype(str).drop_duplicates().to_numpy())) - known)
+            if new_series:
+                self.series_index = self.series_index + new_series
+                self.model.add_series(len(new_series))
+            start = self.last_day + timedelta(days=1)
+            _, units = daily_unit_matrix(df, start, end, self.keys, self.series_index)
+            for t in range(units.shape[1]):
+                self.model.update(units[:, t])
+            self.last_day = end
+            return units.shape[1]
+
+    def forecast_frame(self, horizon=30):
+        with self.lock:
+            forecast = self.model.forecast(horizon)
+            frame = pd.DataFrame(self.series_index, columns=self.keys)
+            frame['Forecast'] = forecast.sum(axis=1)
+            frame['DailyRate'] = forecast.mean(axis=1)
+            frame['Sigma'] = np.sqrt(self.model.mse)
+            frame['Alpha'] = self.model.alpha
+        return frame
+
+    def daily_forecast(self, horizon=30, group_by=('VehicleType',), branches=None):
+        with self.lock:
+            forecast = self.model.forecast(horizon)
+            series = pd.DataFrame(self.series_index, columns=self.keys)
+        if branches is not None:
+            in_scope = series['Branch'].isin([str(branch) for branch in branches]).to_numpy()
+            forecast, series = forecast[in_scope], series[in_scope].reset_index(drop=True)
+        groups = series[list(group_by)]
+        days = pd.date_range(self.last_day + timedelta(days=1), periods=horizon)
+        frame = pd.DataFrame(forecast, columns=days)
+        frame[list(group_by)] = groups
+        long = frame.melt(id_vars=list(group_by), var_name='Date', value_name='Units')
+        return long.groupby(list(group_by) + ['Date'], as_index=False)['Units'].sum()
+
+
+# Reorder quantities: lead-time demand plus safety stock, less vehicles on hand
+def reorder_suggestions(forecaster, df, branches=None, lead_time_days=LEAD_TIME_DAYS, z=SERVICE_LEVEL_Z):
+    plan = forecaster.forecast_frame(horizon=lead_time_days)
+    if branches is not None:
+        plan = plan[plan['Branch'].isin([str(branch) for branch in branches])]
+    on_hand = (df[df['Status'] == 'Available'].astype({key: str for key in forecaster.keys})
+               .groupby(forecaster.keys).size().rename('OnHand').reset_index())
+    plan = plan.merge(on_hand, on=forecaster.keys, how='left').fillna({'OnHand': 0})
+    plan['SafetyStock'] = z * plan['Sigma'] * np.sqrt(lead_time_days)
+    plan['ReorderQty'] = np.ceil(np.clip(plan['Forecast'] + plan['SafetyStock'] - plan['OnHand'], 0, None)).astype(int)
+    return plan.sort_values('ReorderQty', ascending=False).reset_index(drop=True)
@@ -0,0 +1,120 @@
+import heapq
+import threading
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+LEADERBOARD_SIZE = 20
+ALL_BRANCHES = '*'
+
+
+def period_key(purchase_date):
+    return pd.Timestamp(purchase_date).strftime('%Y-%m')
+
+
+def previous_period(period):
+    return (pd.Period(period, freq='M') - 1).strftime('%Y-%m')
+
+
+# Per-period salesperson totals with an incrementally maintained top-k by revenue
+class PeriodLeaderboard:
+    def __init__(self, k=LEADERBOARD_SIZE):
+        self.k = k
+        self.revenue = defaultdict(float)
+        self.units = defaultdict(int)
+        self.mix = defaultdict(Counter)  # EmployeeId -> Counter of (VehicleType, Model)
+        self.top = []  # [(revenue, EmployeeId)], highest first, at most k entries
+
+    def add_sale(self, employee_id, payment, vehicle_type, model, sign=1):
+        self.revenue[employee_id] += sign * payment
+        self.units[employee_id] += sign
+        self.mix[employee_id][(vehicle_type, model)] += sign
+        if self.units[employee_id] == 0:
+            del self.revenue[employee_id], self.units[employee_id], self.mix[employee_id]
+        if sign > 0:
+            self._promote(employee_id)
+        else:
+            self._rebuild()
+
+    # A growing total can only displace the current k-th entry, so this stays O(k)
+    def _promote(self, employee_id):
+        score = self.revenue[employee_id]
+        self.top = [entry for entry in self.top if entry[1] != employee_id]
+        if len(self.top) >= self.k and score <= self.top[-1][0]:
+            return
+        self.top.append((score, employee_id))
+        self.top.sort(key=lambda entry: entry[0], reverse=True)
+        del self.top[self.k:]
+
+    # Totals only shrink on returns/corrections, which are rare; rescan the period's employees
+    def _rebuild(self):
+        self.top = heapq.nlargest(self.k, ((score, emp) for emp, score in self.revenue.items()),
+                                  key=lambda entry: entry[0])
+
+    def top_k(self, n=None):
+        return self.top[:n or self.k]
+
+    def rank(self, employee_id):
+        for position, (_, emp) in enumerate(self.top, start=1):
+            if emp == employee_id:
+                return position
+        return None
+
+    @classmethod
+    def merge(cls, parts, k=LEADERBOARD_SIZE):
+        merged = cls(k)
+        for part in parts:
+            for emp, score in part.revenue.items():
+                merged.revenue[emp] += score
+                merged.units[emp] += part.units[emp]
+                merged.mix[emp].update(part.mix[emp])
+        merged._rebuild()
+        return merged
+
+
+# Leaderboards per (branch, month) plus an all-branch board, fed by the branch change feeds
+class EmployeeLeaderboards:
+    def __init__(self, k=LEADERBOARD_SIZE):
+        self.k = k
+        self.boards = defaultdict(lambda: PeriodLeaderboard(self.k))
+        self.watermarks = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_partitions(cls, partitions, k=LEADERBOARD_SIZE):
+        leaderboards = cls(k)
+        leaderboards.watermarks = partitions.subscribe('leaderboards')
+        for dataset in partitions.datasets.values():
+            sold = dataset.frame[dataset.frame['Status'] == 'Sold']
+            for row in sold.itertuples(index=False):
+                leaderboards._apply_row(row._asdict(), +1)
+        return partitions.follow(leaderboards)
+
+    def _apply_row(self, row, sign):
+        if row is None or row['Status'] != 'Sold':
+            return
+        period = period_key(row['PurchaseDate'])
+        for scope in (row['Branch'], ALL_BRANCHES):
+            self.boards[(scope, period)].add_sale(int(row['EmployeeId']), row['Payment'],
+                                                  row['VehicleType'], row['Model'], sign)
+
+    def sync(self, partitions):
+        with self.lock:
+            for branch, dataset in partitions.datasets.items():
+                events, self.watermarks[branch] = dataset.feed.changes_since(
+                    self.watermarks.get(branch, 0), consumer='leaderboards')
+                for event in events:
+                    self._apply_row(event['before'], -1)
+                    self._apply_row(event['after'], +1)
+
+    def periods(self):
+        return sorted({period for _, period in self.boards}, reverse=True)
+
+    # Board for a showroom scope; all-branch and single-branch scopes need no merge
+    def board(self, branches, period, all_branches=()):
+        if set(branches) == set(all_branches):
+            return self.boards.get((ALL_BRANCHES, period)) or PeriodLeaderboard(self.k)
+        parts = [self.boards[(branch, period)] for branch in branches if (branch, period) in self.boards]
+        if len(parts) == 1:
+            return parts[0]
+        return PeriodLeaderboard.merge(parts, self.k)
@@ -0,0 +1,190 @@
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+STATUSES = ['Available', 'Sold', 'Under Repair']
+
+# Seconds between live fragment refreshes on the dashboard
+DEFAULT_REFRESH_SECONDS = int(os.environ.get("DASHBOARD_REFRESH_SECONDS", "10"))
+
+
+# In-process change feed - writers publish row deltas, readers poll by watermark.
+# Events every subscribed consumer has read are dropped from memory.
+class ChangeFeed:
+    def __init__(self):
+        self.events = []
+        self.offset = 0  # events already trimmed
+        self.consumers = {}  # consumer name -> watermark it has read up to
+        self.lock = threading.Lock()
+
+    @property
+    def watermark(self):
+        return self.offset + len(self.events)
+
+    # Register a reader so events are kept until it has seen them; returns its starting watermark
+    def subscribe(self, consumer, watermark=None):
+        with self.lock:
+            self.consumers[consumer] = self.watermark if watermark is None else watermark
+            return self.consumers[consumer]
+
+    def publish(self, kind, key, before=None, after=None):
+        with self.lock:
+            event = {
+                'seq': self.watermark + 1,
+                'ts': datetime.now(),
+                'kind': kind,
+                'key': key,
+                'before': before,
+                'after': after,
+            }
+            self.events.append(event)
+        return event['seq']
+
+    def changes_since(self, watermark, consumer=None):
+        with self.lock:
+            if watermark < self.offset:
+                raise ValueError(f"events before {self.offset} were trimmed; subscribe the consumer first")
+            events, watermark = self.events[watermark - self.offset:], self.watermark
+            if consumer is not None:
+                self.consumers[consumer] = watermark
+                self._trim()
+            return events, watermark
+
+    def _trim(self):
+        if not self.consumers:
+            return
+        low = min(self.consumers.values())
+        if low > self.offset:
+            del self.events[:low - self.offset]
+            self.offset = low
+
+
+# Working copy of the vehicle table; every write goes through the change feed.
+# Writes replace self.frame (copy-on-write), so a frame a reader already holds never changes.
+class LiveDataset:
+    def __init__(self, df, feed=None):
+        self.frame = df.reset_index(drop=True)
+        self.feed = feed or ChangeFeed()
+        self.lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self.feed.watermark
+
+    def add_vehicle(self, row):
+        with self.lock:
+            row = {col: row.get(col) for col in self.frame.columns}
+            self.frame = pd.concat([self.frame, pd.DataFrame([row])], ignore_index=True)
+            return self.feed.publish('vehicle_added', row['VehicleNumber'], after=row)
+
+    def update_vehicle(self, vehicle_number, **changes):
+        with self.lock:
+            matches = self.frame.index[self.frame['VehicleNumber'] == vehicle_number]
+            if len(matches) == 0:
+                return None
+            idx = matches[0]
+            frame = self.frame.copy()
+            before = frame.loc[idx].to_dict()
+            for col, value in changes.items():
+                frame.at[idx, col] = value
+            after = frame.loc[idx].to_dict()
+            self.frame = frame
+            return self.feed.publish('vehicle_updated', vehicle_number, before=before, after=after)
+
+
+# Dashboard aggregates maintained from feed deltas instead of rescanning the table
+class LiveAggregates:
+    def __init__(self, df=None, watermark=0):
+        self.status_counts = {status: 0 for status in STATUSES}
+        self.monthly_revenue = np.zeros(12)
+        self.monthly_count = np.zeros(12, dtype=int)
+        self.daily_revenue = np.zeros((12, 31))  # [month - 1, day - 1]
+        self.day_revenue = defaultdict(float)  # sale date -> revenue, for the weekly trend
+        self.day_count = defaultdict(int)
+        self.type_counts = defaultdict(int)  # VehicleType -> units sold
+        self.watermark = watermark
+        self.lock = threading.Lock()
+        if df is None:
+            return
+
+        self.status_counts.update(df['Status'].value_counts().to_dict())
+        sold = df[df['Status'] == 'Sold']
+        months = sold['PurchaseDate'].dt.month.to_numpy() - 1
+        days = sold['PurchaseDate'].dt.day.to_numpy() - 1
+        payments = sold['Payment'].to_numpy(dtype=float)
+        np.add.at(self.monthly_revenue, months, payments)
+        np.add.at(self.monthly_count, months, 1)
+        np.add.at(self.daily_revenue, (months, days), payments)
+        by_day = sold.groupby(sold['PurchaseDate'].dt.date)['Payment'].agg(['sum', 'count'])
+        self.day_revenue.update(by_day['sum'].astype(float).to_dict())
+        self.day_count.update(by_day['count'].to_dict())
+        self.type_counts.update(sold['VehicleType'].value_counts().to_dict())
+
+    # Combine rollups (e.g. per branch) without going back to the raw rows
+    @classmethod
+    def merge(cls, parts):
+        merged = cls()
+        for part in parts:
+            with part.lock:
+                for status, count in part.status_counts.items():
+                    merged.status_counts[status] = merged.status_counts.get(status, 0) + count
+                merged.monthly_revenue += part.monthly_revenue
+                merged.monthly_count += part.monthly_count
+                merged.daily_revenue += part.daily_revenue
+                for day, revenue in part.day_revenue.items():
+                    merged.day_revenue[day] += revenue
+                for day, count in part.day_count.items():
+                    merged.day_count[day] += count
+                for vehicle_type, count in part.type_counts.items():
+                    merged.type_counts[vehicle_type] += count
+        return merged
+
+    @property
+    def sold_count(self):
+        return int(self.monthly_count.sum())
+
+    @property
+    def sold_revenue(self):
+        return float(self.monthly_revenue.sum())
+
+    # Revenue and units per ISO week for sales dated on or after `since`
+    def weekly_sales(self, since):
+        first = pd.Timestamp(since).ceil('D').date()  # sale dates are midnight timestamps
+        weekly = defaultdict(lambda: [0.0, 0])
+        for day, count in self.day_count.items():
+            if count and day >= first:
+                week = weekly[day.isocalendar()[1]]
+                week[0] += self.day_revenue[day]
+                week[1] += count
+        return pd.DataFrame([(week, revenue, count) for week, (revenue, count) in sorted(weekly.items())],
+                            columns=['Week', 'Revenue', 'Count'])
+
+    def _apply_row(self, row, sign):
+        if row is None:
+            return
+        self.status_counts[row['Status']] = self.status_counts.get(row['Status'], 0) + sign
+        if row['Status'] == 'Sold':
+            purchase_date = pd.Timestamp(row['PurchaseDate'])
+            month, day = purchase_date.month - 1, purchase_date.day - 1
+            self.monthly_revenue[month] += sign * row['Payment']
+            self.monthly_count[month] += sign
+            self.daily_revenue[month, day] += sign * row['Payment']
+            self.day_revenue[purchase_date.date()] += sign * row['Payment']
+            self.day_count[purchase_date.date()] += sign
+            self.type_counts[row['VehicleType']] += sign
+
+    def apply(self, event):
+        self._apply_row(event['before'], -1)
+        self._apply_row(event['after'], +1)
+
+    # Pull any deltas published since the last sync; returns how many were applied
+    def sync(self, feed):
+        with self.lock:
+            events, self.watermark = feed.changes_since(self.watermark, consumer='aggregates')
+            for event in events:
+                self.apply(event)
+        return len(events)
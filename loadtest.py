@@ -0,0 +1,390 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import closing
+
+import numpy as np
+import websockets  # installed with streamlit
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+# Drives the real app server - `python startup.py`, i.e. streamlit run plus the prewarmed worker, in
+# its own process - with independent websocket sessions speaking the browser's protocol: reruns that
+# carry widget states, the forward-message cache, and the live fragments' timed auto-reruns. Latency
+# and throughput therefore include the server's own threads, GIL and lock contention.
+#   python loadtest.py --users 16 --actions 25
+#   python loadtest.py --users 4,8,16,32 --json results.json   - one run per concurrency level
+#
+# The clients share one event loop in this process; protobuf parsing is native, so a client costs
+# a small fraction of the server's work per rerun.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STARTUP_PATH = os.path.join(APP_DIR, "startup.py")
+
+NAV_PAGES = {
+    "🏠 Dashboard": 'dashboard',
+    "🚗 Vehicle Management": 'vehicle_management',
+    "👥 Customer Management": 'customer_management',
+    "🔧 Repair Management": 'repair_management',
+    "🏪 Supplier Management": 'supplier_management',
+    "💰 Sales Reports": 'sales_reports',
+    "🏆 Employee Performance": 'employee_performance',
+}
+VEHICLE_FILTERS = ["Filter by Type", "Filter by Status", "Filter by Model"]
+ACTIONS = ['navigate', 'filter', 'submit']
+ACTION_WEIGHTS = [0.5, 0.3, 0.2]
+LIVE_REFRESH = 'live refresh'  # fragment auto-reruns (run_every) fired while the user is idle
+
+
+class MissingWidget(LookupError):
+    pass
+
+
+# Vehicle table (and, through the app, the repair store) in a throwaway SQLite file
+def write_sqlite_standin(path, seed, size):
+    from sample_data import SampleDataProvider
+    vehicles = SampleDataProvider(seed=seed, size=size).vehicles()
+    with closing(sqlite3.connect(path)) as conn:
+        vehicles.to_sql('vehicle_sales', conn, index=False, if_exists='replace')
+    return len(vehicles)
+
+
+def _free_port():
+    with closing(socket.socket()) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _http_status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except OSError:
+        return None
+
+
+# The app in its own process, launched the way it is deployed
+class AppServer:
+    def __init__(self, workdir, env):
+        self.port = _free_port()
+        self.readiness_port = _free_port()
+        self.env = dict(env, READINESS_PORT=str(self.readiness_port), READINESS_HOST="127.0.0.1")
+        self.log_path = os.path.join(workdir, "server.log")
+        self.url = f"ws://127.0.0.1:{self.port}/_stcore/stream"
+        self.process = None
+
+    # Returns once the server answers and the prewarm has finished (GET /ready)
+    def start(self, timeout):
+        with open(self.log_path, "wb") as log:
+            self.process = subprocess.Popen(
+                [sys.executable, STARTUP_PATH, "--server.headless", "true", "--server.address", "127.0.0.1",
+                 "--server.port", str(self.port), "--server.fileWatcherType", "none",
+                 "--browser.gatherUsageStats", "false"],
+                cwd=APP_DIR, env=self.env, stdout=log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.process.poll() is None:
+            if _http_status(f"http://127.0.0.1:{self.readiness_port}/ready") == 200 and \
+                    _http_status(f"http://127.0.0.1:{self.port}/_stcore/health") == 200:
+                return
+            time.sleep(0.2)
+        self.stop()
+        with open(self.log_path, errors="replace") as log:
+            raise RuntimeError("app server did not become ready:\n" + "".join(log.readlines()[-20:]))
+
+    # Resident memory of the server process from /proc (Linux); None where that is unavailable
+    def rss_kib(self):
+        try:
+            with open(f"/proc/{self.process.pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return None
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+# One browser tab: a websocket session with its widget states and message cache, driven by random clicks
+class BrowserSession:
+    def __init__(self, user_id, seed, url, timeout):
+        self.user_id = user_id
+        self.rng = np.random.default_rng([seed, user_id])
+        self.url = url
+        self.timeout = timeout
+        self.ws = None
+        self.page = 'dashboard'
+        self.page_script_hash = ""
+        self.widgets = {}  # delta path -> (element type, proto) for the buttons and selectboxes on screen
+        self.widget_states = {}  # widget id -> WidgetState, resent with every rerun like the browser does
+        self.message_cache = {}  # hash -> ForwardMsg; once reported, the server sends only references
+        self.auto_reruns = {}  # fragment id -> [interval seconds, next due (monotonic)]
+        self.samples = []  # (action, seconds), successful reruns only
+        self.errors = []  # (action, message)
+
+    async def start(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        await self._rerun('first load')
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    # A script exception is a failed rerun; a protocol failure or timeout propagates
+    async def _rerun(self, action, trigger=None, fragment_id=None):
+        back = BackMsg()
+        state = back.rerun_script
+        state.page_script_hash = self.page_script_hash
+        state.widget_states.widgets.extend(self.widget_states.values())
+        if trigger is not None:
+            state.widget_states.widgets.append(WidgetState(id=trigger, trigger_value=True))
+        if fragment_id is not None:
+            state.fragment_id = fragment_id
+            state.is_auto_rerun = True
+        state.cached_message_hashes.extend(self.message_cache)
+        begin = time.perf_counter()
+        await self.ws.send(back.SerializeToString())
+        exceptions = await asyncio.wait_for(self._read_run(), self.timeout)
+        if exceptions:
+            self.errors.append((action, exceptions[0]))
+        else:
+            self.samples.append((action, time.perf_counter() - begin))
+        if fragment_id is None:
+            # The browser forgets the state of widgets that are no longer on screen
+            on_screen = {widget.id for _, widget in self.widgets.values()}
+            self.widget_states = {key: value for key, value in self.widget_states.items() if key in on_screen}
+
+    # Messages up to the end of the requested run; returns the exception messages it rendered
+    async def _read_run(self):
+        exceptions = []
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            if msg.HasField('ref_hash'):
+                reference = msg
+                msg = ForwardMsg()
+                msg.CopyFrom(self.message_cache[reference.ref_hash])
+                msg.metadata.CopyFrom(reference.metadata)
+            elif msg.metadata.cacheable:
+                self.message_cache[msg.hash] = msg
+            kind = msg.WhichOneof('type')
+            if kind == 'new_session':
+                self.page_script_hash = msg.new_session.page_script_hash
+                if not msg.new_session.fragment_ids_this_run:
+                    self.widgets, self.auto_reruns = {}, {}
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'exception' and not element.exception.is_warning:
+                    exceptions.append(f"{element.exception.type}: {element.exception.message}".splitlines()[0])
+                elif element_type in ('button', 'selectbox'):
+                    self.widgets[tuple(msg.metadata.delta_path)] = (element_type, getattr(element, element_type))
+            elif kind == 'auto_rerun':
+                interval = msg.auto_rerun.interval
+                self.auto_reruns[msg.auto_rerun.fragment_id] = [interval, time.monotonic() + interval]
+            elif kind == 'stop_auto_rerun':
+                for fragment_id in msg.stop_auto_rerun.fragment_ids:
+                    self.auto_reruns.pop(fragment_id, None)
+            elif kind == 'script_finished':
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    exceptions.append("script failed to compile")
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:  # st.rerun() starts another run
+                    return exceptions
+
+    def _widget(self, element_type, label):
+        for kind, widget in self.widgets.values():
+            if kind == element_type and widget.label == label:
+                return widget
+        raise MissingWidget(f"no {element_type} labelled {label!r}")
+
+    def _choice(self, options):
+        return options[int(self.rng.integers(len(options)))]
+
+    async def _open(self, label):
+        await self._rerun('navigate', trigger=self._widget('button', label).id)
+        self.page = NAV_PAGES[label]
+
+    # Picking an option reruns the script, as in the browser
+    async def _select(self, action, label):
+        selectbox = self._widget('selectbox', label)
+        option = self._choice(list(selectbox.options))
+        self.widget_states[selectbox.id] = WidgetState(id=selectbox.id, string_value=option)
+        await self._rerun(action)
+
+    async def navigate(self):
+        await self._open(self._choice(list(NAV_PAGES)))
+
+    async def filter(self):
+        if self.page != 'vehicle_management':
+            await self._open("🚗 Vehicle Management")
+        await self._select('filter', self._choice(VEHICLE_FILTERS))
+
+    # Writes go through the same feeds and SQLite repair store as a real form submit
+    async def submit(self):
+        if self.page != 'vehicle_management':
+            await self._open("🚗 Vehicle Management")
+        if self.rng.random() < 0.5:
+            vehicle, button = "Select Vehicle for Repair", "Submit for Repair"
+        else:
+            vehicle, button = "Select Vehicle to Update", "Update Vehicle"
+        await self._select('filter', vehicle)
+        await self._rerun('submit', trigger=self._widget('button', button).id)
+
+    async def act(self):
+        action = ACTIONS[int(self.rng.choice(len(ACTIONS), p=ACTION_WEIGHTS))]
+        try:
+            await getattr(self, action)()
+        except MissingWidget as e:
+            self.errors.append((action, str(e)))  # the page did not render the expected widget
+
+    # Between actions the page's live fragments rerun on their own timers, as in an idle browser tab
+    async def idle(self, seconds):
+        deadline = time.monotonic() + seconds
+        while True:
+            for fragment_id, (interval, due) in list(self.auto_reruns.items()):
+                if due <= time.monotonic() and fragment_id in self.auto_reruns:
+                    self.auto_reruns[fragment_id][1] = time.monotonic() + interval
+                    await self._rerun(LIVE_REFRESH, fragment_id=fragment_id)
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            await asyncio.sleep(min([due for _, due in self.auto_reruns.values()] + [deadline]) - now)
+
+    async def drive(self, actions, think_seconds):
+        for _ in range(actions):
+            await self.idle(self.rng.exponential(think_seconds) if think_seconds else 0)
+            await self.act()
+
+
+def _percentiles(seconds):
+    if not seconds:
+        return {'count': 0, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    p50, p95, p99 = np.percentile(np.array(seconds) * 1000, [50, 95, 99])
+    return {'count': len(seconds), 'p50_ms': round(p50, 1), 'p95_ms': round(p95, 1), 'p99_ms': round(p99, 1)}
+
+
+async def run_load(server, users, actions, seed=0, think_seconds=0.0, timeout=60):
+    # Warm the per-scope caches first so latency and memory exclude one-off work on the first session
+    warmup = BrowserSession(users, seed, server.url, timeout)  # seed stream after the measured users
+    await warmup.start()
+    await warmup.close()
+    if warmup.errors:
+        raise RuntimeError(f"first load failed: {warmup.errors[0][1]}")
+
+    # Sessions are opened one at a time; the server's resident memory growth is what they retain
+    rss_before = server.rss_kib()
+    sessions = []
+    for user_id in range(users):
+        session = BrowserSession(user_id, seed, server.url, timeout)
+        await session.start()
+        sessions.append(session)
+    rss_after = server.rss_kib()
+
+    crashes = []
+
+    # A protocol failure or timeout leaves the session out of step with the server, so it stops there
+    async def drive(session):
+        try:
+            await session.drive(actions, think_seconds)
+        except Exception as e:
+            crashes.append(f"user {session.user_id}: {e!r}")
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(drive(session) for session in sessions))
+    wall = time.perf_counter() - begin
+    for session in sessions:
+        await session.close()
+
+    # Percentiles and throughput cover successful reruns only; failures are reported separately
+    samples = [sample for session in sessions for sample in session.samples if sample[0] != 'first load']
+    errors = [error for session in sessions for error in session.errors]
+    by_action = {action: _percentiles([seconds for name, seconds in samples if name == action])
+                 for action in ACTIONS + [LIVE_REFRESH]}
+    return {
+        'users': users,
+        'reruns': len(samples),
+        'errors': len(errors) + len(crashes),
+        'error_messages': sorted({message for _, message in errors}) + crashes,
+        'wall_seconds': round(wall, 2),
+        'throughput_per_second': round(len(samples) / wall, 2) if wall else None,
+        'latency': _percentiles([seconds for _, seconds in samples]),
+        'latency_by_action': by_action,
+        'first_load': _percentiles([seconds for session in sessions for name, seconds in session.samples
+                                    if name == 'first load']),
+        'server_rss_growth_kib': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+    }
+
+
+def format_report(result):
+    lines = [
+        f"users={result['users']}  reruns={result['reruns']}  errors={result['errors']}  "
+        f"wall={result['wall_seconds']}s  throughput={result['throughput_per_second']} reruns/s",
+        f"{'action':<12} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    rows = [('all', result['latency'])] + list(result['latency_by_action'].items()) + \
+        [('first load', result['first_load'])]
+    for name, stats in rows:
+        if stats['count']:
+            lines.append(f"{name:<12} {stats['count']:>6} {stats['p50_ms']:>9.1f} "
+                         f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+    # Raw RSS delta; allocator reuse and garbage collection make it noisy for a handful of sessions
+    if result['server_rss_growth_kib'] is not None:
+        lines.append(f"server RSS growth while opening {result['users']} sessions: "
+                     f"{result['server_rss_growth_kib']} KiB")
+    lines += [f"ERROR {message}" for message in result['error_messages']]
+    return "\n".join(lines)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Drive one app server with concurrent browser sessions.")
+    parser.add_argument('--users', default="8", help="concurrent sessions; comma-separated for a sweep")
+    parser.add_argument('--actions', type=int, default=20, help="clicks/filters/submits per session")
+    parser.add_argument('--think', type=float, default=0.0, help="mean think time between actions (s)")
+    parser.add_argument('--vehicles', type=int, default=2000, help="rows in the SQLite stand-in")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=60, help="per-rerun timeout (s)")
+    parser.add_argument('--startup-timeout', type=float, default=120, help="wait for the server to be ready (s)")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="vms-loadtest-", ignore_cleanup_errors=True) as workdir:
+        database = os.path.join(workdir, "standin.sqlite")
+        rows = write_sqlite_standin(database, args.seed, args.vehicles)
+        print(f"SQLite stand-in: {database} ({rows} vehicles)")
+        # Sessions are not logged in, so they browse as the VMS_USER identity (head office by default)
+        server = AppServer(workdir, dict(os.environ, SQLITE_DATA_PATH=database,
+                                         VMS_USER=os.environ.get("VMS_USER", "admin")))
+        server.start(args.startup_timeout)
+        try:
+            for users in [int(value) for value in args.users.split(',')]:
+                result = asyncio.run(run_load(server, users, args.actions, args.seed, args.think, args.timeout))
+                results.append(result)
+                print(format_report(result))
+                print()
+        finally:
+            server.stop()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(result['errors'] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
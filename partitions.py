@@ -0,0 +1,112 @@
+import json
+import os
+
+import pandas as pd
+
+from live import LiveAggregates, LiveDataset
+
+BRANCHES = ['Colombo', 'Kandy', 'Galle', 'Kurunegala']
+HEAD_OFFICE = 'Head Office'
+
+# Which showrooms each user may see; head office users see every branch.
+# Override with a JSON object in VMS_USER_BRANCHES, e.g. {"kandy_manager": ["Kandy"]}
+DEFAULT_USER_BRANCHES = {
+    'admin': [HEAD_OFFICE],
+    'colombo_manager': ['Colombo'],
+    'kandy_manager': ['Kandy'],
+    'galle_manager': ['Galle'],
+    'kurunegala_manager': ['Kurunegala'],
+    'southern_regional': ['Galle', 'Colombo'],
+}
+USER_BRANCHES = json.loads(os.environ["VMS_USER_BRANCHES"]) if "VMS_USER_BRANCHES" in os.environ \
+    else DEFAULT_USER_BRANCHES
+# Identity used when no one is logged in through the auth layer (local runs, load tests).
+# Unset means no identity and so no showroom access; branch scoping must never fail open.
+DEFAULT_USER = os.environ.get("VMS_USER")
+
+
+def branches_for_user(user, branches=BRANCHES):
+    allowed = USER_BRANCHES.get(user, [])
+    if HEAD_OFFICE in allowed:
+        return list(branches)
+    return [branch for branch in branches if branch in allowed]
+
+
+# Vehicle table split by branch; every branch has its own working frame, feed and rollup
+class BranchPartitions:
+    def __init__(self, df, branch_column='Branch'):
+        self.branch_column = branch_column
+        self.empty = df.iloc[0:0]  # keeps the column dtypes for partitions opened by add_vehicle
+        self.consumers = set()  # feed readers outside this class, subscribed to every partition
+        self.followers = []  # readers with sync(partitions), brought up to date after every write
+        self.datasets = {}
+        self.aggregates = {}
+        for branch, frame in df.groupby(branch_column, sort=True):
+            self._add_partition(branch, frame)
+
+    def _add_partition(self, branch, frame):
+        dataset = LiveDataset(frame)
+        for consumer in self.consumers | {'aggregates'}:
+            dataset.feed.subscribe(consumer)
+        self.datasets[branch] = dataset
+        self.aggregates[branch] = LiveAggregates(dataset.frame, watermark=dataset.version)
+
+    # Subscribe a feed reader to every branch, current and future; returns branch -> watermark
+    def subscribe(self, consumer):
+        self.consumers.add(consumer)
+        return {branch: dataset.feed.subscribe(consumer) for branch, dataset in self.datasets.items()}
+
+    # Sync a subscribed reader on every write. Readers that only sync when their page is open
+    # would otherwise hold every event in the feeds until someone opens that page.
+    def follow(self, follower):
+        self.followers.append(follower)
+        return follower
+
+    def _after_write(self, branch):
+        self.aggregates[branch].sync(self.datasets[branch].feed)
+        for follower in list(self.followers):
+            follower.sync(self)
+
+    @property
+    def branches(self):
+        return list(self.datasets)
+
+    def version(self, branches):
+        return tuple(self.datasets[branch].version for branch in branches)
+
+    # Only the requested partitions are touched; a single branch is returned without copying
+    def frame(self, branches):
+        frames = [self.datasets[branch].frame for branch in branches if branch in self.datasets]
+        if not frames:
+            return self.empty
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    # Per-branch rollups brought up to date, merged when more than one branch is in scope
+    def rollup(self, branches):
+        parts = []
+        for branch in branches:
+            if branch in self.aggregates:
+                self.aggregates[branch].sync(self.datasets[branch].feed)
+                parts.append(self.aggregates[branch])
+        if len(parts) == 1:
+            return parts[0]
+        return LiveAggregates.merge(parts)
+
+    # A new branch starts empty so its first row reaches every feed reader like any other add
+    def add_vehicle(self, row):
+        branch = row[self.branch_column]
+        if branch not in self.datasets:
+            self._add_partition(branch, self.empty)
+        seq = self.datasets[branch].add_vehicle(row)
+        self._after_write(branch)
+        return seq
+
+    def update_vehicle(self, vehicle_number, branches=None, **changes):
+        for branch in branches or self.branches:
+            seq = self.datasets[branch].update_vehicle(vehicle_number, **changes)
+            if seq is not None:
+                self._after_write(branch)
+                return branch, seq
+        return None, None
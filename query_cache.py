@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import pandas as pd
+
+ALL = "All"
+
+
+# Canonical form of a filter combination: equality filters plus inclusive date ranges
+class FilterSignature:
+    def __init__(self, equals=None, date_ranges=None):
+        # "All"/None mean "no filter" and are dropped so equivalent selections share one key
+        self.equals = {col: value for col, value in (equals or {}).items() if value not in (None, ALL)}
+        self.date_ranges = {
+            col: (pd.Timestamp(start).normalize() if start is not None else None,
+                  pd.Timestamp(end).normalize() if end is not None else None)
+            for col, (start, end) in (date_ranges or {}).items()
+        }
+        self.key = (tuple(sorted((col, str(value)) for col, value in self.equals.items())),
+                    tuple(sorted((col, str(start), str(end)) for col, (start, end) in self.date_ranges.items())))
+
+    def __repr__(self):
+        return f"FilterSignature{self.key}"
+
+
+# One combined mask over the frame; no intermediate filtered copies
+def apply_filters(frame, signature):
+    mask = pd.Series(True, index=frame.index)
+    for col, value in signature.equals.items():
+        mask &= frame[col] == value
+    for col, (start, end) in signature.date_ranges.items():
+        if start is not None:
+            mask &= frame[col] >= start
+        if end is not None:
+            mask &= frame[col] < end + timedelta(days=1)
+    return frame[mask]
+
+
+# LRU result cache keyed by (dataset version, filter signature), bounded by entries and bytes
+class QueryCache:
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (dataset_key, signature.key) -> (frame, nbytes)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    # compute(frame, signature) is an index-backed evaluator; when given it answers misses directly.
+    # Misses are never derived from a cached broader result: gathering that result's rows costs more
+    # than the index's bitmap AND over the whole frame.
+    def get_or_compute(self, dataset_key, signature, frame, compute=None):
+        if not signature.equals and not signature.date_ranges:
+            return frame  # unfiltered - the source frame itself, never duplicated into the cache
+        key = (dataset_key, signature.key)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+
+        result = compute(frame, signature) if compute else apply_filters(frame, signature)
+
+        nbytes = int(result.memory_usage(index=True, deep=True).sum())
+        with self.lock:
+            if key not in self.entries and nbytes <= self.max_bytes:
+                self.entries[key] = (result, nbytes)
+                self.total_bytes += nbytes
+                self._evict()
+        return result
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, nbytes) = self.entries.popitem(last=False)
+            self.total_bytes -= nbytes
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,299 @@
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from sketches import QuantileSketch
+
+REPAIR_STATUSES = ['Pending', 'In Progress', 'Completed']
+
+# Repair event store schema - one row per repair job; open repairs carry their planned EndDate (if any)
+REPAIR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repair_events (
+    RepairId INTEGER PRIMARY KEY AUTOINCREMENT,
+    VehicleNumber TEXT NOT NULL,
+    Branch TEXT,
+    Model TEXT,
+    StartDate TEXT NOT NULL,
+    EndDate TEXT,
+    Location TEXT,
+    Details TEXT,
+    RepairCost INTEGER NOT NULL DEFAULT 0,
+    RepairStatus TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_repairs_open
+    ON repair_events (Branch, StartDate) WHERE RepairStatus != 'Completed';
+CREATE INDEX IF NOT EXISTS idx_repairs_vehicle
+    ON repair_events (VehicleNumber);
+"""
+
+REPAIR_COLUMNS = ['RepairId', 'VehicleNumber', 'Branch', 'Model', 'StartDate', 'EndDate',
+                  'Location', 'Details', 'RepairCost', 'RepairStatus']
+
+
+def _to_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+# Status implied by the Add Repair form dates
+def derive_repair_status(start_date, end_date, today=None):
+    today = today or date.today()
+    start_date, end_date = _to_date(start_date), _to_date(end_date)
+    if start_date > today:
+        return 'Pending'
+    if end_date is None or end_date > today:
+        return 'In Progress'
+    return 'Completed'
+
+
+# Running aggregates for the Repair Cost Analytics card, updated per event
+class RepairStats:
+    def __init__(self):
+        self.total_cost = 0
+        self.repair_count = 0
+        self.completed_count = 0
+        self.total_duration_days = 0
+        self.open_starts = {}  # RepairId -> StartDate of repairs still in the backlog
+        self.costs = QuantileSketch()  # mergeable, so multi-branch percentiles never re-sort costs
+        self.opened_days = Counter()  # StartDate -> repairs opened that day
+        self.completed_days = Counter()  # EndDate -> repairs completed that day
+
+    def add(self, repair_id, start_date, end_date, cost, status):
+        self.total_cost += cost
+        self.repair_count += 1
+        self.opened_days[_to_date(start_date)] += 1
+        if cost > 0:
+            self.costs.add(cost)
+        if status == 'Completed':
+            self._record_duration(start_date, end_date)
+        else:
+            self.open_starts[repair_id] = _to_date(start_date)
+
+    def complete(self, repair_id, end_date):
+        start_date = self.open_starts.pop(repair_id, None)
+        if start_date is not None:
+            self._record_duration(start_date, end_date)
+
+    def _record_duration(self, start_date, end_date):
+        self.completed_count += 1
+        self.total_duration_days += max((_to_date(end_date) - _to_date(start_date)).days, 0)
+        self.completed_days[_to_date(end_date)] += 1
+
+    def opened_since(self, since):
+        since = _to_date(since)
+        return sum(count for day, count in self.opened_days.items() if day >= since)
+
+    def completed_since(self, since):
+        since = _to_date(since)
+        return sum(count for day, count in self.completed_days.items() if day >= since)
+
+    @property
+    def backlog(self):
+        return len(self.open_starts)
+
+    @property
+    def avg_repair_days(self):
+        if self.completed_count == 0:
+            return 0.0
+        return self.total_duration_days / self.completed_count
+
+    def oldest_open_days(self, today=None):
+        if not self.open_starts:
+            return 0
+        today = today or date.today()
+        return max((today - min(self.open_starts.values())).days, 0)
+
+    # Combine per-branch stats for a multi-branch view
+    @classmethod
+    def merge(cls, parts):
+        merged = cls()
+        for part in parts:
+            merged.total_cost += part.total_cost
+            merged.repair_count += part.repair_count
+            merged.completed_count += part.completed_count
+            merged.total_duration_days += part.total_duration_days
+            merged.open_starts.update(part.open_starts)
+            merged.costs.merge(part.costs)
+            merged.opened_days.update(part.opened_days)
+            merged.completed_days.update(part.completed_days)
+        return merged
+
+    def cost_percentile(self, q):
+        return self.costs.quantile(q / 100)
+
+
+# SQLite-backed repair event store shared by all sessions of the app
+class RepairStore:
+    def __init__(self, path=":memory:"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(REPAIR_SCHEMA)
+        self.lock = threading.Lock()
+        self.stats = RepairStats()
+        self.branch_stats = defaultdict(RepairStats)
+        self.repair_branches = {}  # RepairId -> Branch, to route completions
+        self.watermarks = {}  # branch -> change feed position already checked for vehicles leaving repair
+        for branch, *row in self.conn.execute(
+                "SELECT Branch, RepairId, StartDate, EndDate, RepairCost, RepairStatus FROM repair_events"):
+            self.stats.add(*row)
+            self.branch_stats[branch].add(*row)
+            self.repair_branches[row[0]] = branch
+
+    def stats_for(self, branches=None):
+        if branches is None:
+            return self.stats
+        if len(branches) == 1:
+            return self.branch_stats[branches[0]]
+        return RepairStats.merge([self.branch_stats[branch] for branch in branches])
+
+    # Branch filter shared by the scoped queries
+    def _branch_clause(self, branches):
+        if branches is None:
+            return "", ()
+        return f" AND Branch IN ({', '.join('?' * len(branches))})", tuple(branches)
+
+    def add_repair(self, vehicle_number, start_date, end_date=None, cost=0,
+                   location="", details="", model=None, status=None, branch=None):
+        start_date = _to_date(start_date)
+        end_date = _to_date(end_date)
+        status = status or derive_repair_status(start_date, end_date)
+        if status == 'Completed' and end_date is None:
+            end_date = date.today()
+        with self.lock:
+            cur = self.conn.execute(
+                "INSERT INTO repair_events (VehicleNumber, Branch, Model, StartDate, EndDate, Location, "
+                "Details, RepairCost, RepairStatus) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (vehicle_number, branch, model, start_date.isoformat(),
+                 end_date.isoformat() if end_date else None,
+                 location, details, int(cost), status)
+            )
+            self.conn.commit()
+            self.stats.add(cur.lastrowid, start_date, end_date, int(cost), status)
+            self.branch_stats[branch].add(cur.lastrowid, start_date, end_date, int(cost), status)
+            self.repair_branches[cur.lastrowid] = branch
+        return cur.lastrowid
+
+    def complete_repair(self, repair_id, end_date=None):
+        end_date = _to_date(end_date) or date.today()
+        with self.lock:
+            updated = self.conn.execute(
+                "UPDATE repair_events SET EndDate = ?, RepairStatus = 'Completed' "
+                "WHERE RepairId = ? AND RepairStatus != 'Completed'",
+                (end_date.isoformat(), repair_id)
+            ).rowcount
+            self.conn.commit()
+            if updated:
+                self.stats.complete(repair_id, end_date)
+                self.branch_stats[self.repair_branches.get(repair_id)].complete(repair_id, end_date)
+        return bool(updated)
+
+    def has_open_repair(self, vehicle_number):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM repair_events WHERE VehicleNumber = ? AND RepairStatus != 'Completed' LIMIT 1",
+                (vehicle_number,)
+            ).fetchone() is not None
+
+    def complete_vehicle_repairs(self, vehicle_number, end_date=None):
+        with self.lock:
+            repair_ids = [row[0] for row in self.conn.execute(
+                "SELECT RepairId FROM repair_events WHERE VehicleNumber = ? AND RepairStatus != 'Completed'",
+                (vehicle_number,))]
+        return sum(self.complete_repair(repair_id, end_date) for repair_id in repair_ids)
+
+    # Close open repairs whose planned end date has passed; returns the (vehicle, branch) pairs closed
+    def complete_due(self, today=None):
+        today = _to_date(today) or date.today()
+        with self.lock:
+            due = self.conn.execute(
+                "SELECT RepairId, VehicleNumber, Branch, EndDate FROM repair_events "
+                "WHERE RepairStatus != 'Completed' AND EndDate <= ?",
+                (today.isoformat(),)
+            ).fetchall()
+        closed = []
+        for repair_id, vehicle_number, branch, end_date in due:
+            if self.complete_repair(repair_id, end_date):
+                closed.append((vehicle_number, branch))
+        return closed
+
+    # Start watching the branch change feeds from their current position
+    def follow(self, partitions):
+        self.watermarks = partitions.subscribe('repairs')
+        return partitions.follow(self)
+
+    # A vehicle moved out of Under Repair (Update Vehicle, Mark as Sold, ...) closes its open repairs
+    def sync(self, partitions):
+        closed = 0
+        for branch, dataset in partitions.datasets.items():
+            events, self.watermarks[branch] = dataset.feed.changes_since(
+                self.watermarks.get(branch, 0), consumer='repairs')
+            for event in events:
+                before, after = event['before'], event['after']
+                if before is not None and after is not None and \
+                        before['Status'] == 'Under Repair' and after['Status'] != 'Under Repair':
+                    closed += self.complete_vehicle_repairs(event['key'], event['ts'])
+        return closed
+
+    def _query(self, sql, params=()):
+        import pandas as pd
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=REPAIR_COLUMNS)
+
+    # Served from idx_repairs_open, never touches completed rows or other branches
+    def active_repairs(self, branches=None):
+        clause, params = self._branch_clause(branches)
+        return self._query(
+            f"SELECT * FROM repair_events WHERE RepairStatus != 'Completed'{clause} ORDER BY StartDate",
+            params)
+
+    def repair_history(self, vehicle_number=None, branches=None):
+        clause, params = self._branch_clause(branches)
+        if vehicle_number:
+            return self._query(
+                f"SELECT * FROM repair_events WHERE VehicleNumber = ?{clause} ORDER BY StartDate DESC",
+                (vehicle_number,) + params)
+        return self._query(f"SELECT * FROM repair_events WHERE 1 = 1{clause} ORDER BY StartDate DESC", params)
+
+    # Answered from the per-day counts in RepairStats, so the KPI refresh never scans repair_events
+    def _stats_parts(self, branches):
+        if branches is None:
+            return [self.stats]
+        return [self.branch_stats[branch] for branch in branches]
+
+    def opened_since(self, since, branches=None):
+        with self.lock:
+            return sum(stats.opened_since(since) for stats in self._stats_parts(branches))
+
+    def completed_since(self, since, branches=None):
+        with self.lock:
+            return sum(stats.completed_since(since) for stats in self._stats_parts(branches))
+
+    def is_empty(self):
+        return self.stats.repair_count == 0
+
+
+# Seed the store from the RepairCost/RepairStatus columns of the sales data
+def seed_repairs_from_sales(store, df, seed=0):
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    repairs = df[(df['RepairCost'] > 0) | (df['Status'] == 'Under Repair')]
+    for row in repairs.itertuples(index=False):
+        start = min(_to_date(row.PurchaseDate) + timedelta(days=int(rng.integers(1, 60))), today)
+        if row.Status == 'Under Repair':
+            status = row.RepairStatus if row.RepairStatus in ('Pending', 'In Progress') else 'In Progress'
+            end = None
+        else:
+            status = 'Completed'
+            end = min(start + timedelta(days=int(rng.integers(0, 7))), today)
+        store.add_repair(row.VehicleNumber, start, end, cost=row.RepairCost,
+                         location=row.Address.split(', ')[-1], model=row.Model, status=status,
+                         branch=getattr(row, 'Branch', None))
+    return store
@@ -0,0 +1,114 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from filter_engine import FilterIndexCache
+from forecasting import DemandForecaster
+from leaderboards import EmployeeLeaderboards
+from partitions import BranchPartitions
+from query_cache import QueryCache
+from repairs import RepairStore, seed_repairs_from_sales
+from sample_data import DEFAULT_SAMPLE_SEED, REPAIR_STREAM, SampleDataProvider
+from sketches import SalesSketchIndex
+from status_history import StatusHistory
+
+# Process-wide cached resources. They live outside dashboard.py so startup.py can
+# build them before the first session arrives; the script reruns then reuse them.
+
+# Sample data creation (replace with SQL data loading)
+# Seeded provider - same seed gives the same dataset, keyed by its fingerprint
+sample_provider = SampleDataProvider(seed=DEFAULT_SAMPLE_SEED)
+SAMPLE_DATA_SNAPSHOT = os.environ.get("SAMPLE_DATA_SNAPSHOT")
+# Local SQLite stand-in for the SQL Server tables (vehicle_sales, repair_events), e.g. for load tests
+SQLITE_DATA_PATH = os.environ.get("SQLITE_DATA_PATH")
+
+# Shared read-only snapshot; cache_resource so a prewarm in the same process is reused by every session
+@st.cache_resource
+def load_sample_snapshot(fingerprint):
+    return sample_provider.load(SAMPLE_DATA_SNAPSHOT)
+
+@st.cache_resource
+def load_sqlite_vehicles(path):
+    with closing(sqlite3.connect(path)) as conn:
+        return pd.read_sql("SELECT * FROM vehicle_sales", conn, parse_dates=['PurchaseDate'])
+
+def load_sample_data():
+    if SQLITE_DATA_PATH:
+        return load_sqlite_vehicles(SQLITE_DATA_PATH)
+    return load_sample_snapshot(sample_provider.fingerprint)['vehicles']
+
+def load_supplier_data():
+    return load_sample_snapshot(sample_provider.fingerprint)['suppliers']
+
+# Working vehicle table partitioned by branch; the write forms publish their changes to each branch feed
+@st.cache_resource
+def get_branch_partitions():
+    return BranchPartitions(load_sample_data())
+
+# Salesperson leaderboards per branch and month, kept current from the branch feeds
+@st.cache_resource
+def get_employee_leaderboards():
+    return EmployeeLeaderboards.from_partitions(get_branch_partitions())
+
+# Demand model fitted once over all branches, then advanced as days close
+@st.cache_resource
+def get_demand_forecaster():
+    partitions = get_branch_partitions()
+    return DemandForecaster().fit(partitions.frame(partitions.branches), datetime.now())
+
+# Per-day sales sketches for the approximate Sales Reports mode
+@st.cache_resource
+def get_sales_sketches():
+    return SalesSketchIndex.from_partitions(get_branch_partitions())
+
+# Background workers for exact recomputation behind approximate results
+@st.cache_resource
+def get_background_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="exact-report")
+
+# Repair event store, shared across sessions and seeded from the sales data
+@st.cache_resource
+def get_repair_store():
+    store = RepairStore(SQLITE_DATA_PATH or ":memory:")
+    if store.is_empty():
+        seed_repairs_from_sales(store, load_sample_data(), seed=[sample_provider.seed, REPAIR_STREAM])
+    return store.follow(get_branch_partitions())
+
+# Vehicle status audit log with snapshots, seeded from the table and repair records
+@st.cache_resource
+def get_status_history():
+    return StatusHistory.from_partitions(get_branch_partitions(), get_repair_store())
+
+# Filter results shared across sessions and reruns
+@st.cache_resource
+def get_query_cache():
+    return QueryCache()
+
+# Identifies the exact rows a scoped query sees: generated dataset, branches and their feed positions
+def dataset_key(branches):
+    return (sample_provider.fingerprint, tuple(branches), get_branch_partitions().version(branches))
+
+# Category bitmaps for the All Vehicles / Sales Reports filters, one per showroom scope
+@st.cache_resource
+def get_filter_indexes():
+    return FilterIndexCache()
+
+def get_filter_index(branches, frame):
+    return get_filter_indexes().get(tuple(branches), dataset_key(branches), frame)
+
+# Everything a first page view needs, in dependency order, for prewarming
+PREWARM_STEPS = [
+    ('load sample data', load_sample_data),
+    ('load supplier data', load_supplier_data),
+    ('build branch partitions', get_branch_partitions),
+    ('seed repair store', get_repair_store),
+    ('build employee leaderboards', get_employee_leaderboards),
+    ('build sales sketches', get_sales_sketches),
+    ('build status history', get_status_history),
+    ('fit demand forecaster', get_demand_forecaster),
+]
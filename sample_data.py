@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from partitions import BRANCHES
+
+# Bump whenever the generator logic changes so cached/snapshotted datasets are invalidated
+SAMPLE_DATA_VERSION = 2
+DEFAULT_SAMPLE_SEED = int(os.environ.get("SAMPLE_DATA_SEED", "42"))
+DEFAULT_SAMPLE_SIZE = 200
+
+# Vehicle models
+BIKE_MODELS = ['Dio', 'Pulsar', 'Fz', 'Ct100', 'Platina']
+THREE_WHEEL_MODELS = ['Auto Rickshaw', 'Three Wheeler']
+
+# Sri Lankan names database
+SRI_LANKAN_FIRST_NAMES = [
+    'Kamal', 'Nimal', 'Sunil', 'Rohan', 'Ajith', 'Chaminda', 'Pradeep', 'Nuwan', 'Dinesh', 'Mahesh',
+    'Saman', 'Ruwan', 'Gayan', 'Chathura', 'Thilina', 'Kasun', 'Lahiru', 'Dilan', 'Buddhika', 'Sampath',
+    'Kumara', 'Thushara', 'Indika', 'Chandana', 'Tharaka', 'Sandun', 'Prasad', 'Udaya', 'Janaka', 'Dilshan',
+    'Sachith', 'Ranjan', 'Lakmal', 'Nalin', 'Dileepa', 'Charith', 'Ashan', 'Ranil', 'Asanka', 'Chamara',
+    'Raveena', 'Sewwandi', 'Nimali', 'Rashika', 'Sandani', 'Thanuja', 'Kavisha', 'Dilrukshi', 'Chathurika', 'Dinusha',
+    'Gayani', 'Malani', 'Anusha', 'Shamali', 'Nadeeka', 'Priyanka', 'Charuni', 'Manisha', 'Randika', 'Tharushi',
+    'Hiruni', 'Sachini', 'Buddhini', 'Nayana', 'Ishara', 'Amila', 'Suranga', 'Darshana', 'Isuru', 'Shanka'
+]
+
+SRI_LANKAN_LAST_NAMES = [
+    'Silva', 'Perera', 'Fernando', 'Jayawardena', 'Gunasekara', 'Wijesinghe', 'Rajapaksa', 'Wickramasinghe',
+    'Mendis', 'Bandara', 'Rathnayaka', 'Dissanayaka', 'Gunawardena', 'Senaratne', 'Wijerathne', 'Peiris',
+    'Kumara', 'Weerasinghe', 'Jayasuriya', 'Ranasinghe', 'Gamage', 'Amarasinghe', 'Liyanage', 'Abeywardena',
+    'Abeysinghe', 'Wickremaratne', 'Ratnayake', 'Kumarasinghe', 'Priyantha', 'Samaraweera', 'Herath', 'Karunaratne',
+    'Jayaratne', 'Weerasekara', 'Kodikara', 'Senanayake', 'Wickramage', 'Dharmasena', 'Pathirana', 'Madusanka'
+]
+
+# Sri Lankan cities and areas
+SRI_LANKAN_ADDRESSES = [
+    'Colombo 01', 'Colombo 02', 'Colombo 03', 'Colombo 04', 'Colombo 05', 'Colombo 06', 'Colombo 07',
+    'Dehiwala', 'Mount Lavinia', 'Moratuwa', 'Panadura', 'Kalutara', 'Beruwala', 'Bentota', 'Galle',
+    'Matara', 'Tangalle', 'Hambantota', 'Ratnapura', 'Embilipitiya', 'Balangoda', 'Kandy', 'Peradeniya',
+    'Gampola', 'Nawalapitiya', 'Hatton', 'Nuwara Eliya', 'Bandarawela', 'Badulla', 'Monaragala', 'Wellawaya',
+    'Kurunegala', 'Puttalam', 'Chilaw', 'Negombo', 'Wattala', 'Ja-Ela', 'Gampaha', 'Kadawatha', 'Ragama',
+    'Kelaniya', 'Maharagama', 'Kottawa', 'Piliyandala', 'Homagama', 'Avissawella', 'Malabe', 'Battaramulla',
+    'Anuradhapura', 'Polonnaruwa', 'Dambulla', 'Sigiriya', 'Matale', 'Akurana', 'Trincomalee', 'Batticaloa',
+    'Ampara', 'Kalmunai', 'Jaffna', 'Vavuniya', 'Mannar', 'Kilinochchi', 'Mullativu'
+]
+
+# Sri Lankan vehicle number prefixes (actual format)
+VEHICLE_PREFIXES = ['WP', 'CP', 'SP', 'EP', 'NP', 'NC', 'UP', 'SG', 'NW']
+
+
+STREET_NAMES = ['Galle Road', 'Kandy Road', 'Negombo Road', 'Main Street', 'Temple Road',
+                'School Lane', 'Church Street', 'Station Road', 'Lake Road', 'Hill Street']
+
+SRI_LANKAN_SUPPLIER_COMPANIES = [
+    'Abans PLC', 'Singer (Sri Lanka) PLC', 'Softlogic Holdings PLC', 'Hemas Holdings PLC',
+    'John Keells Holdings PLC', 'Cargills (Ceylon) PLC', 'Commercial Bank of Ceylon PLC',
+    'Dialog Axiata PLC', 'Ceylon Tobacco Company PLC', 'Lanka IOC PLC',
+    'Dimo Motors', 'United Motors Lanka (UML)', 'AMW Group', 'David Pieris Motor Company',
+    'Ideal Motors', 'Micro Cars (Pvt) Ltd', 'Stafford Motor Company', 'Prestige Automobile',
+    'Asia Motor Works', 'Central Finance Company PLC'
+]
+
+SUPPLIER_TYPES = ['Vehicle Importer', 'Parts Supplier', 'Service Provider', 'Finance Partner', 'Insurance Provider']
+
+# Independent generator streams so each dataset is reproducible on its own
+VEHICLE_STREAM = 0
+SUPPLIER_STREAM = 1
+REPAIR_STREAM = 2
+
+
+# Seeded sample-data provider; the fingerprint identifies the generated dataset for caches
+class SampleDataProvider:
+    def __init__(self, seed=DEFAULT_SAMPLE_SEED, size=DEFAULT_SAMPLE_SIZE, year=None):
+        self.seed = seed
+        self.size = size
+        self.year = year or datetime.now().year
+
+    @property
+    def fingerprint(self):
+        spec = {'version': SAMPLE_DATA_VERSION, 'seed': self.seed, 'size': self.size, 'year': self.year}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+    def generator(self, stream):
+        return np.random.default_rng([self.seed, stream])
+
+    def vehicles(self):
+        rng = self.generator(VEHICLE_STREAM)
+        data = []
+        
+        for i in range(1, self.size + 1):
+            vehicle_type = rng.choice(['Bike', 'Three Wheeler'], p=[0.7, 0.3])
+            if vehicle_type == 'Bike':
+                model = rng.choice(BIKE_MODELS)
+                price_range = (400000, 600000)
+            else:
+                model = rng.choice(THREE_WHEEL_MODELS)
+                price_range = (800000, 1000000)
+            
+            # Generate dates across all 12 months of the year
+            random_month = rng.integers(1, 13)
+            random_day = rng.integers(1, 29)  # Safe day range for all months
+            purchase_date = datetime(self.year, random_month, random_day)
+            
+            # Generate Sri Lankan customer details
+            customer_name = f"{rng.choice(SRI_LANKAN_FIRST_NAMES)} {rng.choice(SRI_LANKAN_LAST_NAMES)}"
+            
+            # Generate Sri Lankan style address
+            house_no = rng.integers(1, 999)
+            street = rng.choice(STREET_NAMES)
+            city = rng.choice(SRI_LANKAN_ADDRESSES)
+            address = f"{house_no}/{rng.integers(1, 20)}, {street}, {city}"
+            
+            # Generate Sri Lankan NIC number (format: YYMMDDXXXV or new format)
+            birth_year = rng.integers(70, 99)  # 1970-1999
+            if rng.random() > 0.5:  # Old format
+                nic = f"{birth_year:02d}{rng.integers(100, 365):03d}{rng.integers(1000, 9999):04d}V"
+            else:  # New format
+                nic = f"{1900 + birth_year}{rng.integers(100, 365):03d}{rng.integers(10000, 99999):05d}"
+            
+            # Generate phone number (Sri Lankan format)
+            phone = f"0{rng.choice([70, 71, 72, 75, 76, 77, 78])}{rng.integers(1000000, 9999999)}"
+            
+            # Generate vehicle number (Sri Lankan format)
+            prefix = rng.choice(VEHICLE_PREFIXES)
+            if vehicle_type == 'Bike':
+                vehicle_number = f"{prefix} {rng.choice(['CAA', 'CAB', 'CAC', 'CAD', 'CAE'])} {rng.integers(1000, 9999)}"
+            else:
+                vehicle_number = f"{prefix} {rng.choice(['PA', 'PB', 'PC', 'PD', 'PE'])} {rng.integers(1000, 9999)}"
+            
+            data.append({
+                'Branch': rng.choice(BRANCHES),
+                'VehicleNumber': vehicle_number,
+                'CustomerId': i,
+                'CustomerName': customer_name,
+                'Address': address,
+                'NIC': nic,
+                'Phone': phone,
+                'VehicleType': vehicle_type,
+                'Model': model,
+                'PurchaseDate': purchase_date,
+                'Payment': rng.integers(*price_range),
+                'PaymentMethod': rng.choice(['Cash', 'Credit Card', 'Bank Transfer', 'Cheque']),
+                'EmployeeId': rng.integers(1, 100),
+                'Status': rng.choice(['Sold', 'Available', 'Under Repair']),
+                'RepairCost': rng.integers(5000, 50000) if rng.random() > 0.7 else 0,
+                'RepairStatus': rng.choice(['Completed', 'In Progress', 'Pending']) if rng.random() > 0.7 else 'None'
+            })
+        
+        return pd.DataFrame(data)
+
+    def suppliers(self):
+        rng = self.generator(SUPPLIER_STREAM)
+        contact_first_names = SRI_LANKAN_FIRST_NAMES[:15]
+        contact_last_names = SRI_LANKAN_LAST_NAMES[:10]
+        
+        return pd.DataFrame({
+            'SupplierID': [f"SUP{str(i).zfill(3)}" for i in range(1, 21)],
+            'CompanyName': rng.choice(SRI_LANKAN_SUPPLIER_COMPANIES, 20, replace=False),
+            'ContactPerson': [f"{rng.choice(contact_first_names)} {rng.choice(contact_last_names)}" for _ in range(20)],
+            'SupplierType': rng.choice(SUPPLIER_TYPES, 20),
+            'Address': [f"{rng.integers(100, 999)}, {rng.choice(['Galle Road', 'Kandy Road', 'Negombo Road', 'Baseline Road', 'Duplication Road'])}, {rng.choice(['Colombo 03', 'Colombo 04', 'Dehiwala', 'Mount Lavinia', 'Moratuwa', 'Kandy', 'Galle', 'Negombo'])}" for _ in range(20)],
+            'Phone': [f"011{rng.integers(2000000, 2999999)}" for _ in range(20)],
+            'Email': [f"{company.lower().replace(' ', '').replace('(', '').replace(')', '').replace('pvt', '').replace('plc', '').replace('ltd', '')}@gmail.com" for company in rng.choice(SRI_LANKAN_SUPPLIER_COMPANIES, 20, replace=False)],
+            'Rating': rng.choice([3.5, 4.0, 4.2, 4.5, 4.7, 4.8, 4.9, 5.0], 20),
+            'LastDelivery': pd.date_range(start='2024-01-01', end='2025-06-01', periods=20).strftime('%Y-%m-%d'),
+            'TotalOrders': rng.integers(5, 150, 20),
+            'Status': rng.choice(['Active', 'Pending', 'Suspended'], 20, p=[0.8, 0.15, 0.05])
+        })
+
+    # Write the generated datasets to disk, tagged with the fingerprint they came from
+    def snapshot(self, path):
+        pd.to_pickle({
+            'fingerprint': self.fingerprint,
+            'vehicles': self.vehicles(),
+            'suppliers': self.suppliers()
+        }, path)
+        return path
+
+    # Reload a snapshot; returns None when it is missing or was made by a different generator
+    def load_snapshot(self, path):
+        if not path or not os.path.exists(path):
+            return None
+        snapshot = pd.read_pickle(path)
+        if snapshot.get('fingerprint') != self.fingerprint:
+            return None
+        return snapshot
+
+    def load(self, snapshot_path=None):
+        snapshot = self.load_snapshot(snapshot_path)
+        if snapshot is None:
+            if snapshot_path:
+                self.snapshot(snapshot_path)
+                snapshot = self.load_snapshot(snapshot_path)
+            else:
+                snapshot = {'fingerprint': self.fingerprint,
+                            'vehicles': self.vehicles(), 'suppliers': self.suppliers()}
+        return snapshot
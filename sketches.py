@@ -0,0 +1,256 @@
+import math
+import threading
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+HLL_PRECISION = 11  # 2048 registers, ~2.3% standard error
+QUANTILE_ACCURACY = 0.01  # relative error of quantile estimates
+CMS_WIDTH = 272  # e/272 ~ 1% of the partition's rows
+CMS_DEPTH = 4
+
+
+def _hash(values, hash_key='0123456789123456'):
+    return pd.util.hash_array(np.asarray(values, dtype=object), hash_key=hash_key.ljust(16)[:16])
+
+
+# Distinct counts - registers merge by elementwise max
+class HyperLogLog:
+    def __init__(self, p=HLL_PRECISION):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def add_many(self, values):
+        self.add_hashes(_hash(values))
+
+    def add_hashes(self, hashes):
+        if len(hashes) == 0:
+            return
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        # The remaining 64-p bits fit in a float64 mantissa (p >= 11), so log2 is exact
+        rest = (hashes & np.uint64((1 << (64 - self.p)) - 1)).astype(np.float64)
+        rho = np.where(rest > 0, (64 - self.p) - np.floor(np.log2(np.maximum(rest, 1))), 64 - self.p + 1)
+        np.maximum.at(self.registers, idx, rho.astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return raw
+
+
+# Quantiles with bounded relative error (log-bucketed, DDSketch style); buckets merge by adding counts
+class QuantileSketch:
+    def __init__(self, accuracy=QUANTILE_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.buckets = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value > 0:
+            self.buckets[math.ceil(math.log(value) / math.log(self.gamma))] += 1
+        else:
+            self.zero_count += 1
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        self.count += len(values)
+        keys, counts = np.unique(np.ceil(np.log(positive) / math.log(self.gamma)).astype(np.int64),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] += count
+
+    def merge(self, other):
+        for key, count in other.buckets.items():
+            self.buckets[key] += count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+# Frequencies with one-sided error eps*N (eps = e/width) and a small heavy-hitter candidate set
+class CountMinSketch:
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH, candidates=32):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int32)
+        self.total = 0
+        self.max_candidates = candidates
+        self.candidates = set()
+
+    # Row hashes derived from one 64-bit hash (double hashing): h1 + row * h2
+    def _columns(self, hashes):
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        return [((h1 + np.uint64(row) * h2) % np.uint64(self.width)).astype(np.int64)
+                for row in range(self.depth)]
+
+    def add_many(self, values):
+        self.add_hashes(_hash(values), values)
+
+    def add_hashes(self, hashes, values):
+        if len(hashes) == 0:
+            return
+        for row, columns in enumerate(self._columns(hashes)):
+            np.add.at(self.table[row], columns, 1)
+        self.total += len(hashes)
+        self.candidates.update(pd.unique(np.asarray(values, dtype=object)).tolist())
+        self._trim()
+
+    def estimate_many(self, values):
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(_hash(values))
+        return np.min([self.table[row][cols] for row, cols in enumerate(columns)], axis=0)
+
+    def _trim(self):
+        if len(self.candidates) > self.max_candidates:
+            keys = list(self.candidates)
+            estimates = self.estimate_many(keys)
+            keep = np.argsort(estimates)[::-1][:self.max_candidates]
+            self.candidates = {keys[i] for i in keep}
+
+    def merge(self, other):
+        self.table += other.table
+        self.total += other.total
+        self.candidates |= other.candidates
+        self._trim()
+        return self
+
+    @property
+    def error_bound(self):
+        return math.e / self.width * self.total
+
+    def top_k(self, k=None):
+        keys = list(self.candidates)
+        estimates = self.estimate_many(keys)
+        ranked = sorted(zip(keys, estimates.tolist()), key=lambda item: item[1], reverse=True)
+        return ranked[:k] if k else ranked
+
+
+HASHED_COLUMNS = ['CustomerId', 'VehicleNumber', 'Model', 'PaymentMethod']
+
+
+# All sketches for one day of sold vehicles
+class DaySketch:
+    def __init__(self):
+        self.sales = 0
+        self.revenue = 0.0
+        self.customers = HyperLogLog()
+        self.vehicles = HyperLogLog()
+        self.payments = QuantileSketch()
+        self.repair_costs = QuantileSketch()
+        self.models = CountMinSketch()
+        self.payment_methods = CountMinSketch()
+
+    # hashes: column -> precomputed _hash values aligned with rows
+    @classmethod
+    def from_rows(cls, rows, hashes=None):
+        hashes = hashes or {col: _hash(rows[col].to_numpy()) for col in HASHED_COLUMNS}
+        sketch = cls()
+        sketch.sales = len(rows)
+        sketch.revenue = float(rows['Payment'].sum())
+        sketch.customers.add_hashes(hashes['CustomerId'])
+        sketch.vehicles.add_hashes(hashes['VehicleNumber'])
+        sketch.payments.add_many(rows['Payment'].to_numpy())
+        sketch.repair_costs.add_many(rows.loc[rows['RepairCost'] > 0, 'RepairCost'].to_numpy())
+        sketch.models.add_hashes(hashes['Model'], rows['Model'].to_numpy())
+        sketch.payment_methods.add_hashes(hashes['PaymentMethod'], rows['PaymentMethod'].to_numpy())
+        return sketch
+
+    def merge(self, other):
+        self.sales += other.sales
+        self.revenue += other.revenue
+        self.customers.merge(other.customers)
+        self.vehicles.merge(other.vehicles)
+        self.payments.merge(other.payments)
+        self.repair_costs.merge(other.repair_costs)
+        self.models.merge(other.models)
+        self.payment_methods.merge(other.payment_methods)
+        return self
+
+
+# Day-partitioned sketches per branch; days touched by feed events are rebuilt from that branch's rows
+class SalesSketchIndex:
+    def __init__(self):
+        self.days = {}  # (branch, date) -> DaySketch
+        self.watermarks = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_partitions(cls, partitions):
+        index = cls()
+        index.watermarks = partitions.subscribe('sketches')
+        for branch, dataset in partitions.datasets.items():
+            index._build_days(branch, dataset.frame)
+        return partitions.follow(index)
+
+    def _build_days(self, branch, frame, days=None):
+        sold = frame[frame['Status'] == 'Sold']
+        sale_days = sold['PurchaseDate'].dt.normalize()
+        if days is not None:
+            in_days = sale_days.isin(list(days))
+            sold, sale_days = sold[in_days], sale_days[in_days]
+            for day in days:
+                self.days.pop((branch, day), None)
+        # Hash each column once for the whole branch, then slice per day
+        hashes = {col: _hash(sold[col].to_numpy()) for col in HASHED_COLUMNS}
+        for day, positions in sold.reset_index(drop=True).groupby(sale_days.to_numpy()).indices.items():
+            self.days[(branch, pd.Timestamp(day))] = DaySketch.from_rows(
+                sold.iloc[positions], {col: values[positions] for col, values in hashes.items()})
+
+    def sync(self, partitions):
+        with self.lock:
+            for branch, dataset in partitions.datasets.items():
+                events, self.watermarks[branch] = dataset.feed.changes_since(
+                    self.watermarks.get(branch, 0), consumer='sketches')
+                dirty = {pd.Timestamp(row['PurchaseDate']).normalize()
+                         for event in events for row in (event['before'], event['after']) if row is not None}
+                if dirty:
+                    self._build_days(branch, dataset.frame, dirty)
+
+    # Merge the day sketches of the requested branches inside [start, end]
+    def query(self, branches, start, end):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        merged = DaySketch()
+        monthly = defaultdict(lambda: [0, 0.0])
+        branches = set(branches)
+        with self.lock:
+            for (branch, day), sketch in self.days.items():
+                if branch in branches and start <= day <= end:
+                    merged.merge(sketch)
+                    monthly[day.month][0] += sketch.sales
+                    monthly[day.month][1] += sketch.revenue
+        return merged, dict(monthly)
@@ -0,0 +1,185 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+READINESS_PORT = int(os.environ.get("READINESS_PORT", "8502"))
+# Local-only by default; set READINESS_HOST=0.0.0.0 to expose /ready to an external load balancer
+READINESS_HOST = os.environ.get("READINESS_HOST", "127.0.0.1")
+
+
+# Wall-clock cost of each import/initialization step, recorded once per process
+class StartupReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = []
+        self.recorded = set()
+        self.ready = False
+        self.ready_after = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        if name in self.recorded:
+            yield
+            return
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                if name not in self.recorded:
+                    self.recorded.add(name)
+                    self.steps.append({
+                        'step': name,
+                        'seconds': round(time.perf_counter() - begin, 4),
+                        'thread': threading.current_thread().name,
+                    })
+
+    def mark_ready(self):
+        with self.lock:
+            self.ready = True
+            self.ready_after = round(time.perf_counter() - self.started, 4)
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'ready': self.ready,
+                'ready_after_seconds': self.ready_after,
+                'uptime_seconds': round(time.perf_counter() - self.started, 4),
+                'error': self.error,
+                'steps': list(self.steps),
+            }
+
+    def format_table(self):
+        report = self.as_dict()
+        width = max([len(step['step']) for step in report['steps']] + [4])
+        lines = [f"{'step':<{width}}  seconds", f"{'-' * width}  -------"]
+        lines += [f"{step['step']:<{width}}  {step['seconds']:7.3f}" for step in report['steps']]
+        lines.append(f"ready: {report['ready']} after {report['ready_after_seconds']}s")
+        return "\n".join(lines)
+
+
+# One report per process - module state survives script reruns
+STARTUP_REPORT = StartupReport()
+
+
+# Module proxy that imports on first attribute access and records the import cost
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with STARTUP_REPORT.step(f"import {self._name}"):
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazy_module(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+class _ReadinessHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/ready':
+            status = 200 if STARTUP_REPORT.ready else 503
+            body = {'ready': STARTUP_REPORT.ready}
+        elif self.path == '/startup':
+            status, body = 200, STARTUP_REPORT.as_dict()
+        else:
+            status, body = 404, {'error': 'not found'}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# GET /ready answers 503 until the prewarm finishes, GET /startup returns the timing report
+def start_readiness_server(port=READINESS_PORT, host=READINESS_HOST):
+    try:
+        server = ThreadingHTTPServer((host, port), _ReadinessHandler)
+    except OSError:
+        return None  # already served by this or another process on the host
+    threading.Thread(target=server.serve_forever, name='readiness', daemon=True).start()
+    return server
+
+
+def prewarm():
+    try:
+        with STARTUP_REPORT.step("import resources"):
+            from resources import PREWARM_STEPS
+        for name, build in PREWARM_STEPS:
+            with STARTUP_REPORT.step(name):
+                build()
+        STARTUP_REPORT.mark_ready()
+    except Exception as e:
+        STARTUP_REPORT.error = repr(e)
+        raise
+
+
+def start_prewarm_thread():
+    thread = threading.Thread(target=prewarm, name='prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+_worker_lock = threading.Lock()
+_worker_started = False
+
+
+# Called at the top of every script run; only the first call in a process does anything
+def ensure_worker_started(port=READINESS_PORT):
+    global _worker_started
+    with _worker_lock:
+        if _worker_started:
+            return
+        _worker_started = True
+    start_readiness_server(port)
+    start_prewarm_thread()
+
+
+# Launcher: serve readiness, prewarm caches alongside the server, then run the app.
+#   python startup.py [streamlit run options]   - prewarmed worker
+#   python startup.py --report                  - time every startup step and print the table
+def main(argv):
+    if '--report' in argv:
+        with STARTUP_REPORT.step("import streamlit"):
+            import streamlit  # noqa: F401
+        with STARTUP_REPORT.step("import plotly.express"):
+            importlib.import_module("plotly.express")
+        with STARTUP_REPORT.step("import plotly.graph_objects"):
+            importlib.import_module("plotly.graph_objects")
+        prewarm()
+        print(STARTUP_REPORT.format_table())
+        return 0
+
+    # Streamlit imports plotly, which peeks at sys.modules for pandas; starting the prewarm (which
+    # imports pandas) before that finishes hands plotly a half-initialised pandas module
+    with STARTUP_REPORT.step("import streamlit"):
+        from streamlit.web import cli as stcli
+    ensure_worker_started()
+    sys.argv = ["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.py")] + argv
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    # Go through the importable module so the app script shares this process's report and worker state
+    import startup
+    sys.exit(startup.main(sys.argv[1:]))
@@ -0,0 +1,278 @@
+import bisect
+import threading
+
+import numpy as np
+import pandas as pd
+
+from live import STATUSES
+
+SNAPSHOT_EVERY = 50_000  # sorted events between compacted snapshots
+TAIL_LIMIT = 1_024  # recent events held unsorted before they are merged into the sorted log
+ABSENT = -1  # vehicle not in inventory yet
+
+
+def _to_ns(values):
+    return pd.to_datetime(pd.Series(values)).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+
+# Apply log entries to a per-vehicle state array; only each vehicle's last entry matters
+def _replay(state, vehicles, statuses):
+    if len(vehicles) == 0:
+        return
+    _, last = np.unique(vehicles[::-1], return_index=True)
+    last = len(vehicles) - 1 - last
+    state[vehicles[last]] = statuses[last]
+
+
+# Buffer with room for `needed` items, doubling so appends copy O(1) items amortised
+def _grow(buffer, needed):
+    if needed <= len(buffer):
+        return buffer
+    grown = np.empty(max(needed, 2 * len(buffer), 1024), dtype=buffer.dtype)
+    grown[:len(buffer)] = buffer
+    return grown
+
+
+# Append-only vehicle status log with compacted snapshots for point-in-time inventory.
+# Events are kept sorted by effective time; a snapshot every SNAPSHOT_EVERY events holds
+# every vehicle's status at that point, so a query replays at most one interval.
+class StatusHistory:
+    def __init__(self, statuses=STATUSES):
+        self.statuses = list(statuses)
+        self.codes = {status: i for i, status in enumerate(self.statuses)}
+        self.vehicle_ids = {}  # (branch, vehicle number) -> id; numbers are only unique within a branch
+        self.vehicle_numbers = []
+        self.vehicle_branches = []
+        self._branch_codes = np.zeros(0, dtype=np.int32)  # vehicle id -> index into self.branches
+        self.branches = []
+        # Sorted, compacted log in growth buffers; the first self.size entries are in use
+        self.size = 0
+        self._ts = np.zeros(0, dtype=np.int64)
+        self._vehicle = np.zeros(0, dtype=np.int32)
+        self._status = np.zeros(0, dtype=np.int8)
+        self._previous = np.zeros(0, dtype=np.int8)
+        self.tail = []  # (ts_ns, vehicle, status, previous) in arrival order
+        self.snapshots = []  # (position in sorted log, state array)
+        self.watermarks = {}
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_partitions(cls, partitions, repair_store=None):
+        history = cls()
+        repairs = repair_store.repair_history() if repair_store is not None else None
+        history.watermarks = partitions.subscribe('status_history')
+        for branch, dataset in partitions.datasets.items():
+            history.seed_frame(branch, dataset.frame, repairs)
+        return partitions.follow(history)
+
+    @property
+    def ts(self):
+        return self._ts[:self.size]
+
+    @property
+    def vehicle(self):
+        return self._vehicle[:self.size]
+
+    @property
+    def status(self):
+        return self._status[:self.size]
+
+    @property
+    def previous(self):
+        return self._previous[:self.size]
+
+    @property
+    def branch_codes(self):
+        return self._branch_codes[:len(self.vehicle_numbers)]
+
+    @property
+    def event_count(self):
+        return self.size + len(self.tail)
+
+    def _vehicle_id(self, vehicle_number, branch):
+        vehicle_id = self.vehicle_ids.get((branch, vehicle_number))
+        if vehicle_id is None:
+            vehicle_id = len(self.vehicle_numbers)
+            self.vehicle_ids[(branch, vehicle_number)] = vehicle_id
+            self.vehicle_numbers.append(vehicle_number)
+            self.vehicle_branches.append(branch)
+            if branch not in self.branches:
+                self.branches.append(branch)
+            self._branch_codes = _grow(self._branch_codes, vehicle_id + 1)
+            self._branch_codes[vehicle_id] = self.branches.index(branch)
+        return vehicle_id
+
+    def _code(self, status):
+        return self.codes[status] if status is not None else ABSENT
+
+    # Reconstruct history from the current table: arrival at PurchaseDate (already Sold for sold
+    # vehicles), then Under Repair / back to Available from the repair records of unsold vehicles.
+    # Every row is current stock, so arrivals are clamped to now even when PurchaseDate is later.
+    def seed_frame(self, branch, frame, repairs=None):
+        if len(frame) == 0:
+            return
+        with self.lock:
+            vehicles = np.array([self._vehicle_id(vn, branch) for vn in frame['VehicleNumber']], dtype=np.int32)
+            now = pd.Timestamp.now().value
+            arrival_ts = np.minimum(_to_ns(frame['PurchaseDate']), now)
+            arrival = np.where(frame['Status'].to_numpy() == 'Sold', self.codes['Sold'], self.codes['Available'])
+            parts = [(arrival_ts, vehicles, arrival.astype(np.int8), np.full(len(frame), ABSENT, dtype=np.int8))]
+
+            unsold = frame['Status'].to_numpy() != 'Sold'
+            if repairs is not None:
+                repairs = repairs[repairs['Branch'] == branch]
+            if repairs is not None and len(repairs):
+                positions = {vn: i for i, vn in enumerate(frame['VehicleNumber'])}
+                rows = repairs[repairs['VehicleNumber'].map(lambda vn: vn in positions and unsold[positions[vn]])]
+                idx = rows['VehicleNumber'].map(positions).to_numpy(dtype=np.int64)
+                start = np.clip(_to_ns(rows['StartDate']), arrival_ts[idx], now)
+                repair_code, available = self.codes['Under Repair'], self.codes['Available']
+                parts.append((start, vehicles[idx], np.full(len(idx), repair_code, dtype=np.int8),
+                              np.full(len(idx), available, dtype=np.int8)))
+                closed = (rows['RepairStatus'] == 'Completed').to_numpy()
+                if closed.any():
+                    end = np.maximum(_to_ns(rows['EndDate'][closed]), start[closed])
+                    parts.append((end, vehicles[idx[closed]], np.full(closed.sum(), available, dtype=np.int8),
+                                  np.full(closed.sum(), repair_code, dtype=np.int8)))
+                covered = set(idx.tolist())
+            else:
+                covered = set()
+
+            # Under Repair with no repair record: treat the repair as starting on arrival
+            missing = [i for i in np.flatnonzero(frame['Status'].to_numpy() == 'Under Repair') if i not in covered]
+            if missing:
+                missing = np.array(missing)
+                parts.append((arrival_ts[missing], vehicles[missing],
+                              np.full(len(missing), self.codes['Under Repair'], dtype=np.int8),
+                              np.full(len(missing), self.codes['Available'], dtype=np.int8)))
+
+            self._merge(*(np.concatenate(columns) for columns in zip(*parts)))
+
+    def record(self, vehicle_number, branch, status, ts, previous=None):
+        with self.lock:
+            vehicle_id = self._vehicle_id(vehicle_number, branch)
+            self.tail.append((pd.Timestamp(ts).value, vehicle_id, self._code(status), self._code(previous)))
+            if len(self.tail) >= TAIL_LIMIT:
+                self.compact()
+
+    # Status changes published since the last sync
+    def sync(self, partitions):
+        recorded = 0
+        with self.lock:
+            for branch, dataset in partitions.datasets.items():
+                events, self.watermarks[branch] = dataset.feed.changes_since(
+                    self.watermarks.get(branch, 0), consumer='status_history')
+                for event in events:
+                    before = event['before']['Status'] if event['before'] is not None else None
+                    after = event['after']['Status'] if event['after'] is not None else None
+                    if before != after:
+                        self.record(event['key'], branch, after, event['ts'], previous=before)
+                        recorded += 1
+        return recorded
+
+    def compact(self):
+        with self.lock:
+            if self.tail:
+                ts, vehicle, status, previous = (np.array(column) for column in zip(*self.tail))
+                self.tail = []
+                self._merge(ts, vehicle.astype(np.int32), status.astype(np.int8), previous.astype(np.int8))
+
+    # Merge new events into the sorted log and rebuild only the snapshots after the earliest one.
+    # Only the suffix from the earliest new event is re-sorted; in-order events just append.
+    def _merge(self, ts, vehicle, status, previous):
+        if len(ts) == 0:
+            return
+        first = int(np.searchsorted(self.ts, ts.min(), side='right'))
+        size = self.size + len(ts)
+        # Stable sort keeps existing events ahead of new ones with the same timestamp
+        order = np.argsort(np.concatenate([self.ts[first:], ts]), kind='stable')
+        for name, new in (('_ts', ts), ('_vehicle', vehicle), ('_status', status), ('_previous', previous)):
+            buffer = _grow(getattr(self, name), size)
+            buffer[first:size] = np.concatenate([buffer[first:self.size], new])[order]
+            setattr(self, name, buffer)
+        self.size = size
+
+        while self.snapshots and self.snapshots[-1][0] > first:
+            self.snapshots.pop()
+        position, state = self.snapshots[-1] if self.snapshots else (0, np.zeros(0, dtype=np.int8))
+        state = self._padded(state)
+        while position + SNAPSHOT_EVERY <= len(self.ts):
+            _replay(state, self.vehicle[position:position + SNAPSHOT_EVERY],
+                    self.status[position:position + SNAPSHOT_EVERY])
+            position += SNAPSHOT_EVERY
+            self.snapshots.append((position, state.copy()))
+
+    def _padded(self, state):
+        padded = np.full(len(self.vehicle_numbers), ABSENT, dtype=np.int8)
+        padded[:len(state)] = state
+        return padded
+
+    # Every vehicle's status at `ts`: nearest snapshot, then replay the remaining interval
+    def _state_at(self, ts_ns):
+        end = int(np.searchsorted(self.ts, ts_ns, side='right'))
+        i = bisect.bisect_right([position for position, _ in self.snapshots], end)
+        position, state = self.snapshots[i - 1] if i else (0, np.zeros(0, dtype=np.int8))
+        state = self._padded(state)
+        _replay(state, self.vehicle[position:end], self.status[position:end])
+        return state, end
+
+    def _scope(self, branches):
+        if branches is None:
+            return np.ones(len(self.vehicle_numbers), dtype=bool)
+        codes = [self.branches.index(branch) for branch in branches if branch in self.branches]
+        return np.isin(self.branch_codes, codes)
+
+    def _counts(self, state, scope):
+        present = scope & (state != ABSENT)
+        return np.bincount(state[present], minlength=len(self.statuses))
+
+    def inventory_at(self, ts, branches=None):
+        with self.lock:
+            self.compact()
+            state, _ = self._state_at(pd.Timestamp(ts).value)
+            counts = self._counts(state, self._scope(branches))
+        return dict(zip(self.statuses, counts.tolist()))
+
+    # Status counts at the end of each date, advanced incrementally from the first date's state
+    def inventory_series(self, dates, branches=None):
+        dates = pd.DatetimeIndex(sorted(pd.to_datetime(list(dates))))
+        cutoffs = (dates + pd.Timedelta(days=1)).as_unit('ns').asi8 - 1
+        rows = []
+        with self.lock:
+            self.compact()
+            if len(dates) == 0:
+                return pd.DataFrame(columns=['Date'] + self.statuses)
+            scope = self._scope(branches)
+            state, position = self._state_at(cutoffs[0])
+            counts = self._counts(state, scope)
+            rows.append(counts.copy())
+            for cutoff in cutoffs[1:]:
+                end = int(np.searchsorted(self.ts, cutoff, side='right'))
+                vehicles = np.unique(self.vehicle[position:end])
+                if len(vehicles):
+                    counts -= self._counts(state[vehicles], scope[vehicles])
+                    _replay(state, self.vehicle[position:end], self.status[position:end])
+                    counts += self._counts(state[vehicles], scope[vehicles])
+                position = end
+                rows.append(counts.copy())
+        frame = pd.DataFrame(rows, columns=self.statuses)
+        frame.insert(0, 'Date', dates)
+        return frame
+
+    # Audit trail, newest first
+    def audit_log(self, branches=None, vehicle_number=None, limit=500):
+        with self.lock:
+            self.compact()
+            selected = self._scope(branches)[self.vehicle] if len(self.vehicle) else np.zeros(0, dtype=bool)
+            if vehicle_number is not None:
+                selected &= np.isin(self.vehicle, [vehicle_id for (_, number), vehicle_id in self.vehicle_ids.items()
+                                                   if number == vehicle_number])
+            positions = np.flatnonzero(selected)[::-1][:limit]
+            labels = np.array(self.statuses + [None], dtype=object)  # ABSENT (-1) maps to None
+            return pd.DataFrame({
+                'Timestamp': pd.to_datetime(self.ts[positions]),
+                'VehicleNumber': [self.vehicle_numbers[v] for v in self.vehicle[positions]],
+                'Branch': [self.vehicle_branches[v] for v in self.vehicle[positions]],
+                'FromStatus': labels[self.previous[positions]],
+                'ToStatus': labels[self.status[positions]],
+            })